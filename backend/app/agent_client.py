@@ -1,8 +1,11 @@
 import asyncio
+import functools
+import inspect
+import logging
 import threading
 import time
 from enum import Enum
-from typing import Optional
+from typing import AsyncIterator, List, Optional
 
 import vertexai
 from google.api_core import exceptions, retry
@@ -17,6 +20,9 @@ logger = get_logger(__name__)
 DEFAULT_QUERY_TIMEOUT_SECONDS = 120  # 2 minutes for agent queries
 SESSION_CREATE_TIMEOUT_SECONDS = 30  # 30 seconds for session creation
 
+# Returned when the agent produced no text at all
+NO_RESPONSE_FALLBACK = "I apologize, but I didn't receive a response. Please try again."
+
 # Configure retry policy for Agent Engine calls
 # Handles transient errors with exponential backoff
 AGENT_RETRY_POLICY = retry.Retry(
@@ -102,6 +108,85 @@ class CircuitBreaker:
 # Module-level circuit breaker shared across all requests
 _circuit_breaker = CircuitBreaker(failure_threshold=5, recovery_timeout=60.0)
 
+# Attributes on the AgentEngine handle that hold its execution clients.
+# The pooled-channel code below relies on private google-cloud-aiplatform
+# internals (ClientWithOverride._is_temporary / _version_map / _clients).
+# Verified against 1.138 (uv.lock) through 1.165; on any other layout it falls
+# back to the SDK's stock per-call clients.
+_EXECUTION_CLIENT_ATTRS = ("execution_api_client", "execution_async_client")
+_EXECUTION_CLIENT_TRANSPORTS = ("grpc", "grpc_asyncio")
+
+# Options for the long-lived execution channels: ping every 30s (also while
+# idle) so a connection dropped by a NAT or load balancer is noticed before a
+# chat request is sent on it, and keep a private subchannel per channel.
+_KEEPALIVE_CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30_000),
+    ("grpc.http2.max_pings_without_data", 0),
+    ("grpc.use_local_subchannel_pool", 1),
+]
+
+
+def _keepalive_transport(gapic_client_class, transport_name: str):
+    """
+    Return a transport factory whose gRPC channel carries _KEEPALIVE_CHANNEL_OPTIONS.
+
+    GAPIC clients accept a callable transport and GAPIC transports a callable
+    channel; the channel factory appends the keepalive options to the ones
+    the transport passes (message size limits).
+    """
+    transport_class = gapic_client_class.get_transport_class(transport_name)
+
+    def create_channel(*args, **kwargs):
+        kwargs["options"] = [*(kwargs.get("options") or ()), *_KEEPALIVE_CHANNEL_OPTIONS]
+        return transport_class.create_channel(*args, **kwargs)
+
+    return functools.partial(transport_class, channel=create_channel)
+
+
+def _pooled_client_class(base, transport_name: str):
+    """Subclass an execution ClientWithOverride to hold one keepalive channel instead of one per call."""
+    if not hasattr(base, "_is_temporary"):
+        raise AttributeError(f"{base.__name__} has no _is_temporary")
+    gapic_client_class = dict(base._version_map)[base._default_version]
+    transport = _keepalive_transport(gapic_client_class, transport_name)
+
+    def __init__(self, *args, **kwargs):
+        kwargs["transport"] = transport
+        base.__init__(self, *args, **kwargs)
+
+    return type(f"Pooled{base.__name__}", (base,), {"_is_temporary": False, "__init__": __init__})
+
+
+def _use_pooled_channels(remote_app) -> None:
+    """
+    Make the Agent Engine handle reuse one gRPC channel per execution client.
+
+    The SDK's execution clients are "temporary": every call instantiates a new
+    GAPIC client, which opens a new gRPC channel (TCP + TLS + HTTP/2 setup).
+    Swapping in non-temporary subclasses creates the channel once, with
+    keepalive, and keeps it for the lifetime of the process.
+    """
+    try:
+        from google.cloud.aiplatform import initializer
+        from google.cloud.aiplatform import utils as aip_utils
+
+        bases = (
+            aip_utils.AgentEngineExecutionClientWithOverride,
+            aip_utils.AgentEngineExecutionAsyncClientWithOverride,
+        )
+        pooled_clients = {}
+        for attr, base, transport_name in zip(_EXECUTION_CLIENT_ATTRS, bases, _EXECUTION_CLIENT_TRANSPORTS):
+            pooled_class = _pooled_client_class(base, transport_name)
+            pooled_clients[attr] = initializer.global_config.create_client(client_class=pooled_class)
+    except Exception as e:
+        # SDK internals changed — keep the stock per-call clients
+        logger.warning("Could not enable pooled Agent Engine channels", error=str(e))
+        return
+
+    # Swap both only once both were built, so a failure leaves the handle untouched
+    for attr, client in pooled_clients.items():
+        setattr(remote_app, attr, client)
+
 
 class AgentEngineClient:
     def __init__(self):
@@ -109,6 +194,7 @@ class AgentEngineClient:
         vertexai.init(
             project=settings.google_cloud_project,
             location=settings.google_cloud_location,
+            api_transport="grpc",
         )
         self.resource_name = settings.agent_engine_resource_name
         self._remote_app = None
@@ -117,7 +203,9 @@ class AgentEngineClient:
         """Lazily connect to Agent Engine on first use."""
         if self._remote_app is None:
             try:
-                self._remote_app = agent_engines.get(self.resource_name)
+                remote_app = agent_engines.get(self.resource_name)
+                _use_pooled_channels(remote_app)
+                self._remote_app = remote_app
                 self.agent_engine_app = self._remote_app  # Alias for health checks
                 logger.info("Connected to Agent Engine", resource_name=self.resource_name)
             except Exception as e:
@@ -125,42 +213,105 @@ class AgentEngineClient:
                 raise
         return self._remote_app
 
+    def warm_up(self) -> bool:
+        """Connect to Agent Engine ahead of the first request (blocking — run in a thread)."""
+        try:
+            self._get_remote_app()
+            return True
+        except Exception:
+            return False
+
     @property
     def remote_app(self):
         return self._get_remote_app()
 
-    async def query_agent(
+    async def close(self):
+        """Close the pooled Agent Engine gRPC channels (called on shutdown)."""
+        if self._remote_app is None:
+            return
+
+        for attr in _EXECUTION_CLIENT_ATTRS:
+            client = getattr(self._remote_app, attr, None)
+            if client is None or getattr(client, "_is_temporary", True):
+                continue
+            try:
+                gapic_clients = list(client._clients.values())
+            except AttributeError as e:
+                # SDK internals changed; the channels close with the process
+                logger.warning("Could not close pooled Agent Engine channels", error=str(e))
+                continue
+            for gapic_client in gapic_clients:
+                try:
+                    result = gapic_client.transport.close()
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    logger.warning("Failed to close Agent Engine channel", error=str(e))
+
+        logger.info("Closed Agent Engine channels")
+
+    async def create_session(self, user_id: str) -> str:
+        """
+        Create a new Agent Engine session with retry logic.
+
+        Returns:
+            The Agent Engine session ID
+
+        Raises:
+            TimeoutError: If session creation exceeds SESSION_CREATE_TIMEOUT_SECONDS
+            Exception: If the session could not be created after retries
+        """
+        # Fail fast if the circuit is open (Agent Engine repeatedly unavailable)
+        if _circuit_breaker.is_open():
+            logger.warning("Circuit breaker OPEN — rejecting request without hitting Agent Engine")
+            raise Exception("The agent service is temporarily unavailable. Please try again in a moment.")
+
+        logger.info("Creating new Agent Engine session", user_id=user_id)
+
+        # Create session on Agent Engine with retry logic
+        @AGENT_RETRY_POLICY
+        async def _create_session():
+            async with asyncio.timeout(SESSION_CREATE_TIMEOUT_SECONDS):
+                return await self.remote_app.async_create_session(user_id=user_id)
+
+        try:
+            remote_session = await _create_session()
+        except asyncio.TimeoutError:
+            _circuit_breaker.record_failure()
+            logger.error("Session creation timed out", user_id=user_id)
+            raise TimeoutError("Session creation timed out. Please try again.")
+        except Exception as e:
+            _circuit_breaker.record_failure()
+            logger.error("Failed to create session after retries", error=str(e))
+            raise Exception("Unable to create session: Service temporarily unavailable")
+
+        # Extract the actual session_id from Agent Engine's response
+        agent_engine_session_id = remote_session["id"]
+
+        logger.info("Agent Engine session created", session_id=agent_engine_session_id, user_id=user_id)
+        return agent_engine_session_id
+
+    async def stream_query(
         self,
         user_id: str,
-        agent_engine_session_id: Optional[str],
+        agent_engine_session_id: str,
         message: str,
         timeout_seconds: float = DEFAULT_QUERY_TIMEOUT_SECONDS,
-    ) -> tuple[str, str]:
+    ) -> AsyncIterator[str]:
         """
-        Query the deployed Agent Engine using async_stream_query with retry logic.
-
-        Implements automatic retry with exponential backoff for transient errors:
-        - Rate limiting (429)
-        - Service unavailability (503)
-        - Gateway timeouts (504)
-        - Internal server errors (500)
+        Stream response text from an existing Agent Engine session as it is generated.
 
-        Architecture:
-        - user_id: Identifies the user (from auth or anonymous)
-        - agent_engine_session_id: Agent Engine's session ID for this conversation
-        - If agent_engine_session_id is None, creates a new session on Agent Engine
+        Yields text chunks as soon as each event arrives, so callers can forward
+        them to the client instead of waiting for the full response.
 
         Args:
             user_id: User ID (from auth or anonymous)
-            agent_engine_session_id: Agent Engine session ID (None for new session)
+            agent_engine_session_id: Agent Engine session ID (see create_session)
             message: User message
-            timeout_seconds: Maximum time to wait for response (default: 120s)
-
-        Returns:
-            Tuple of (response_text, agent_engine_session_id)
+            timeout_seconds: Maximum time for the whole stream (default: 120s)
 
         Raises:
-            TimeoutError: If the operation exceeds timeout_seconds
+            TimeoutError: If the stream exceeds timeout_seconds
             Exception: For other failures
         """
         # Fail fast if the circuit is open (Agent Engine repeatedly unavailable)
@@ -168,80 +319,38 @@ class AgentEngineClient:
             logger.warning("Circuit breaker OPEN — rejecting request without hitting Agent Engine")
             raise Exception("The agent service is temporarily unavailable. Please try again in a moment.")
 
-        try:
-            async with asyncio.timeout(timeout_seconds):
-                # Check if we need to create a new session on Agent Engine
-                if not agent_engine_session_id:
-                    logger.info("Creating new Agent Engine session", user_id=user_id)
-
-                    # Create session on Agent Engine with retry logic
-                    @AGENT_RETRY_POLICY
-                    async def _create_session():
-                        async with asyncio.timeout(SESSION_CREATE_TIMEOUT_SECONDS):
-                            return await self.remote_app.async_create_session(user_id=user_id)
-
-                    try:
-                        remote_session = await _create_session()
-                    except asyncio.TimeoutError:
-                        logger.error("Session creation timed out", user_id=user_id)
-                        raise TimeoutError("Session creation timed out. Please try again.")
-                    except Exception as e:
-                        logger.error("Failed to create session after retries", error=str(e))
-                        raise Exception("Unable to create session: Service temporarily unavailable")
-
-                    # Extract the actual session_id from Agent Engine's response
-                    agent_engine_session_id = remote_session["id"]
-
-                    logger.info("Agent Engine session created", session_id=agent_engine_session_id, user_id=user_id)
-                else:
-                    logger.info(
-                        "Using existing Agent Engine session", session_id=agent_engine_session_id, user_id=user_id
-                    )
-
-                logger.info("Querying agent", message_preview=message[:50])
+        logger.info("Querying agent", session_id=agent_engine_session_id, message_preview=message[:50])
 
-                # Stream the query to the agent using Agent Engine's session
-                response_text = ""
-                event_count = 0
+        # The deadline only wraps the wait for the next event, never a yield,
+        # so time spent by the consumer cannot cancel it mid-send.
+        deadline = asyncio.get_running_loop().time() + timeout_seconds
+        event_count = 0
+        response_length = 0
+        # Checked once per query: skips building per-event log kwargs at INFO
+        log_events = logger.isEnabledFor(logging.DEBUG)
 
-                async for event in self.remote_app.async_stream_query(
-                    user_id=user_id, session_id=agent_engine_session_id, message=message
-                ):
-                    event_count += 1
+        try:
+            events = self.remote_app.async_stream_query(
+                user_id=user_id, session_id=agent_engine_session_id, message=message
+            )
+            while True:
+                try:
+                    async with asyncio.timeout_at(deadline):
+                        event = await anext(events)
+                except StopAsyncIteration:
+                    break
+
+                event_count += 1
+                if log_events:
                     logger.debug(
                         "Received event",
                         event_num=event_count,
                         author=event.get("author", "unknown") if isinstance(event, dict) else "unknown",
                     )
 
-                    # Extract text from event
-                    if isinstance(event, dict):
-                        content = event.get("content", event.get("parts", {}))
-
-                        if isinstance(content, dict):
-                            parts = content.get("parts", [])
-
-                            for part in parts:
-                                if isinstance(part, dict):
-                                    if part.get("text"):
-                                        response_text += part["text"]
-                                    elif part.get("function_call"):
-                                        fn = part["function_call"]
-                                        logger.debug("Tool call", tool=fn.get("name"), args=fn.get("args", {}))
-
-                        # Also check for direct text field
-                        if "text" in event:
-                            response_text += event["text"]
-
-                logger.info("Query processing complete", event_count=event_count, response_length=len(response_text))
-
-                if not response_text:
-                    logger.error("No response text extracted", event_count=event_count)
-                    response_text = "I apologize, but I didn't receive a response. Please try again."
-
-                _circuit_breaker.record_success()
-                # Return agent_engine_session_id so it can be tracked in our database
-                return response_text, agent_engine_session_id
+                for text in _extract_event_text(event):
+                    response_length += len(text)
+                    yield text
 
         except asyncio.TimeoutError:
             _circuit_breaker.record_failure()
@@ -249,9 +358,6 @@ class AgentEngineClient:
             raise TimeoutError(
                 f"Request timed out after {timeout_seconds} seconds. " "The system is busy. Please try again."
             )
-        except TimeoutError:
-            # Re-raise TimeoutError from session creation (already counted above)
-            raise
         except Exception as e:
             error_str = str(e)
             # Rate limit errors (Agent Engine returns FAILED_PRECONDITION with "Rate exceeded")
@@ -263,5 +369,91 @@ class AgentEngineClient:
             logger.error("Error querying agent", error=str(e), exc_info=True)
             raise Exception(f"Failed to query agent: {str(e)}")
 
+        logger.info("Query processing complete", event_count=event_count, response_length=response_length)
+        _circuit_breaker.record_success()
+
+    async def query_agent(
+        self,
+        user_id: str,
+        agent_engine_session_id: Optional[str],
+        message: str,
+        timeout_seconds: float = DEFAULT_QUERY_TIMEOUT_SECONDS,
+    ) -> tuple[str, str]:
+        """
+        Query the deployed Agent Engine and return the complete response.
+
+        Implements automatic retry with exponential backoff for transient errors:
+        - Rate limiting (429)
+        - Service unavailability (503)
+        - Gateway timeouts (504)
+        - Internal server errors (500)
+
+        Architecture:
+        - user_id: Identifies the user (from auth or anonymous)
+        - agent_engine_session_id: Agent Engine's session ID for this conversation
+        - If agent_engine_session_id is None, creates a new session on Agent Engine
+
+        Args:
+            user_id: User ID (from auth or anonymous)
+            agent_engine_session_id: Agent Engine session ID (None for new session)
+            message: User message
+            timeout_seconds: Maximum time to wait for response (default: 120s)
+
+        Returns:
+            Tuple of (response_text, agent_engine_session_id)
+
+        Raises:
+            TimeoutError: If the operation exceeds timeout_seconds
+            Exception: For other failures
+        """
+        started = time.monotonic()
+
+        # Check if we need to create a new session on Agent Engine
+        if not agent_engine_session_id:
+            try:
+                # Session creation (including retries) shares the overall query budget
+                async with asyncio.timeout(timeout_seconds):
+                    agent_engine_session_id = await self.create_session(user_id)
+            except asyncio.TimeoutError:
+                raise TimeoutError("Session creation timed out. Please try again.")
+        else:
+            logger.info("Using existing Agent Engine session", session_id=agent_engine_session_id, user_id=user_id)
+
+        # Collect chunks and join once (avoids quadratic string concatenation)
+        remaining = max(timeout_seconds - (time.monotonic() - started), 0.0)
+        parts = [text async for text in self.stream_query(user_id, agent_engine_session_id, message, remaining)]
+        response_text = "".join(parts)
+
+        if not response_text:
+            logger.error("No response text extracted")
+            response_text = NO_RESPONSE_FALLBACK
+
+        # Return agent_engine_session_id so it can be tracked in our database
+        return response_text, agent_engine_session_id
+
+
+def _extract_event_text(event) -> List[str]:
+    """Extract the text parts from a single Agent Engine stream event."""
+    if not isinstance(event, dict):
+        return []
+
+    texts = []
+    content = event.get("content", event.get("parts", {}))
+
+    if isinstance(content, dict):
+        for part in content.get("parts", []):
+            if isinstance(part, dict):
+                if part.get("text"):
+                    texts.append(part["text"])
+                elif part.get("function_call") and logger.isEnabledFor(logging.DEBUG):
+                    fn = part["function_call"]
+                    logger.debug("Tool call", tool=fn.get("name"), args=fn.get("args", {}))
+
+    # Also check for direct text field
+    if "text" in event:
+        texts.append(event["text"])
+
+    return texts
+
 
 agent_client = AgentEngineClient()
@@ -1,26 +1,121 @@
 """
-Authentication — password hashing only.
+Authentication — password hashing and auth token storage.
 
-Token storage is handled by Database.create_token / verify_token / revoke_token
-(Firestore-backed, safe for multi-instance Cloud Run deployments).
+Passwords are hashed with Argon2id (argon2-cffi). Hashes created before the
+switch are bcrypt; they still verify and are upgraded to Argon2id on the next
+successful login (see needs_rehash).
+
+Tokens are stored in Redis when REDIS_URL is configured (TTL-based expiry,
+pooled connections, shared across instances). Otherwise they fall back to
+Database.create_token / verify_token / revoke_token (Firestore-backed, also
+safe for multi-instance Cloud Run deployments).
+
+Secrets are never compared with ==: password checks go through the
+constant-time argon2/bcrypt verifiers and tokens are looked up by key. Any
+new direct comparison of secret values should use hmac.compare_digest.
 """
 
+import asyncio
 import logging
+import secrets
+from typing import Optional
 
 import bcrypt
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError, VerifyMismatchError
+
+from .redis_client import get_redis
 
 logger = logging.getLogger(__name__)
 
+# Argon2id parameters: 2 passes over 64 MiB, single lane
+_password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=1)
+_BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+
+# Tokens expire after 30 days (matches the Firestore token expiry)
+TOKEN_TTL_SECONDS = 30 * 24 * 60 * 60
+_TOKEN_KEY_PREFIX = "token:"
+
+# 32 random bytes per token
+TOKEN_BYTES = 32
+
+
+def hash_password(password: bytes) -> str:
+    """Hash a UTF-8 encoded password using Argon2id with automatic salt generation."""
+    return _password_hasher.hash(password)
 
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt with automatic salt generation."""
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
 
+def verify_password(password: bytes, password_hash: str) -> bool:
+    """Verify a UTF-8 encoded password against its Argon2id (or legacy bcrypt) hash."""
+    if password_hash.startswith(_BCRYPT_PREFIXES):
+        try:
+            return bcrypt.checkpw(password, password_hash.encode("ascii"))
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Password verification failed: {e}")
+            return False
 
-def verify_password(password: str, password_hash: str) -> bool:
-    """Verify a password against its bcrypt hash."""
     try:
-        return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
-    except (ValueError, TypeError) as e:
+        return _password_hasher.verify(password_hash, password)
+    except VerifyMismatchError:
+        return False
+    except (VerificationError, InvalidHashError) as e:
         logger.warning(f"Password verification failed: {e}")
         return False
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """Return True if the hash is legacy bcrypt or uses outdated Argon2 parameters."""
+    if password_hash.startswith(_BCRYPT_PREFIXES):
+        return True
+    try:
+        return _password_hasher.check_needs_rehash(password_hash)
+    except InvalidHashError:
+        return True
+
+
+# =============================================================================
+# TOKEN GENERATION
+# =============================================================================
+
+
+def generate_token() -> str:
+    """Generate a URL-safe auth token (43 chars, 256 bits of entropy)."""
+    return secrets.token_urlsafe(TOKEN_BYTES)
+
+
+# =============================================================================
+# TOKEN STORAGE
+# =============================================================================
+
+
+async def create_token(db, user_id: str) -> str:
+    """Generate and persist an auth token for user_id. Returns the token."""
+    token = generate_token()
+
+    redis = get_redis()
+    if redis is None:
+        await asyncio.to_thread(db.create_token, user_id, token)
+        return token
+
+    await redis.set(_TOKEN_KEY_PREFIX + token, user_id, ex=TOKEN_TTL_SECONDS)
+    return token
+
+
+async def verify_token(db, token: str) -> Optional[str]:
+    """Return user_id for a valid, non-expired token, or None."""
+    redis = get_redis()
+    if redis is None:
+        return await asyncio.to_thread(db.verify_token, token)
+
+    # Expired tokens are evicted by Redis, so a single GET is enough
+    return await redis.get(_TOKEN_KEY_PREFIX + token)
+
+
+async def revoke_token(db, token: str) -> None:
+    """Delete a token (logout)."""
+    redis = get_redis()
+    if redis is None:
+        await asyncio.to_thread(db.revoke_token, token)
+        return
+
+    await redis.delete(_TOKEN_KEY_PREFIX + token)
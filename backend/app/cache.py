@@ -0,0 +1,81 @@
+"""
+In-process TTL + LRU cache for hot Firestore lookups.
+
+Each uvicorn worker / Cloud Run instance keeps its own copy, so TTLs are kept
+short and writes made by this process invalidate their entries explicitly.
+"""
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire ttl_seconds after insertion.
+
+    Usage:
+        cache = TTLCache(maxsize=10_000, ttl_seconds=30)
+        value = cache.get(key)
+        if value is None:
+            value = load(key)
+            cache.set(key, value)
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl_seconds: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Insert or replace a value, evicting the least recently used entry when full."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def update(self, key: Hashable, func: Callable[[Any], Any]) -> None:
+        """Replace a live entry with func(value), keeping its expiry. No-op on a miss."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return
+
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._data[key]
+                return
+
+            self._data[key] = (expires_at, func(value))
+
+    def pop(self, key: Hashable) -> None:
+        """Invalidate a single entry."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Invalidate all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
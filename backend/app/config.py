@@ -20,6 +20,7 @@ class Settings(BaseSettings):
     model_armor_enabled: bool = False
     model_armor_template_id: str = ""
     model_armor_mode: str = "INSPECT_AND_BLOCK"
+    redis_url: str = ""
     env: str = "production"
 
     class Config:
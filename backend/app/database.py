@@ -22,14 +22,15 @@ Data Model:
 import hashlib
 import time
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from functools import wraps
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from google.api_core import exceptions as gcp_exceptions
 from google.api_core import retry
 from google.cloud import firestore
 
+from .cache import TTLCache
 from .logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -53,6 +54,21 @@ FIRESTORE_RETRY = retry.Retry(
     ),
 )
 
+# =============================================================================
+# READ CACHE CONFIGURATION
+# =============================================================================
+
+# get_user_by_email / get_session run on every login and chat request.
+# Entries are per-process and short-lived; writes made through this class
+# invalidate them, writes from other instances become visible within the TTL.
+READ_CACHE_MAXSIZE = 10_000
+READ_CACHE_TTL_SECONDS = 30
+
+# Complete transcripts (fewer messages than the requested limit) are cached
+# per session and extended in place by batched chat writes. Kept smaller than
+# the read cache since each entry holds up to 100 messages.
+MESSAGE_CACHE_MAXSIZE = 1_000
+
 
 def with_retry(func):
     """
@@ -126,6 +142,9 @@ class Database:
     def __init__(self, project_id: str, database_id: str):
         """Initialize Firestore database client."""
         self.db = firestore.Client(project=project_id, database=database_id)
+        self._user_cache = TTLCache(maxsize=READ_CACHE_MAXSIZE, ttl_seconds=READ_CACHE_TTL_SECONDS)
+        self._session_cache = TTLCache(maxsize=READ_CACHE_MAXSIZE, ttl_seconds=READ_CACHE_TTL_SECONDS)
+        self._message_cache = TTLCache(maxsize=MESSAGE_CACHE_MAXSIZE, ttl_seconds=READ_CACHE_TTL_SECONDS)
         logger.info(f"Connected to Firestore: {project_id}/{database_id}")
 
     # =========================================================================
@@ -144,7 +163,7 @@ class Database:
         Args:
             email: User email (unique identifier)
             name: User display name
-            password_hash: Hashed password (use bcrypt in production)
+            password_hash: Hashed password (see app.auth.hash_password)
 
         Returns:
             user_id: Generated user ID
@@ -174,7 +193,7 @@ class Database:
             "email": email,
             "name": name,
             "password_hash": password_hash,
-            "created_at": datetime.now(timezone.utc),
+            "created_at": firestore.SERVER_TIMESTAMP,
             "last_login": None,
             "is_demo": False,  # Mark as non-demo user
         }
@@ -197,10 +216,14 @@ class Database:
             email: User email
 
         Returns:
-            User data dict or None if not found
+            User data dict or None if not found (misses are not cached)
         """
         email_lower = email.lower()
 
+        cached = self._user_cache.get(email_lower)
+        if cached is not None:
+            return cached
+
         # First, try to find in Firestore (works for both demo and regular users)
         query = self.db.collection("users").where("email", "==", email_lower).limit(1)
         results = list(query.stream())
@@ -208,6 +231,7 @@ class Database:
         if results:
             user_data = results[0].to_dict()
             logger.info(f"Found user: {user_data['user_id']} ({email})")
+            self._user_cache.set(email_lower, user_data)
             return user_data
 
         # Also check original case (for backwards compatibility)
@@ -217,6 +241,7 @@ class Database:
             if results:
                 user_data = results[0].to_dict()
                 logger.info(f"Found user: {user_data['user_id']} ({email})")
+                self._user_cache.set(email_lower, user_data)
                 return user_data
 
         # If this is a demo email but not found in DB, the seed hasn't run
@@ -250,7 +275,14 @@ class Database:
     @with_retry
     def update_last_login(self, user_id: str):
         """Update user's last login timestamp."""
-        self.db.collection("users").document(user_id).update({"last_login": datetime.now(timezone.utc)})
+        self.db.collection("users").document(user_id).update({"last_login": firestore.SERVER_TIMESTAMP})
+
+    @with_retry
+    def update_password_hash(self, user_id: str, email: str, password_hash: str):
+        """Replace a user's password hash (used to upgrade legacy hashes on login)."""
+        self.db.collection("users").document(user_id).update({"password_hash": password_hash})
+        self._user_cache.pop(email.lower())
+        logger.info(f"Upgraded password hash for user: {user_id}")
 
     @with_retry
     def create_anonymous_user(self) -> str:
@@ -265,7 +297,7 @@ class Database:
         user_data = {
             "user_id": user_id,
             "is_anonymous": True,
-            "created_at": datetime.now(timezone.utc),
+            "created_at": firestore.SERVER_TIMESTAMP,
         }
 
         self.db.collection("users").document(user_id).set(user_data)
@@ -277,6 +309,21 @@ class Database:
     # SESSION MANAGEMENT
     # =========================================================================
 
+    def _new_session_data(
+        self, user_id: str, agent_engine_session_id: str, session_name: Optional[str], message_count: int
+    ) -> Dict:
+        """Build the document for a new session with a generated session_id."""
+        return {
+            "session_id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "agent_engine_session_id": agent_engine_session_id,
+            "session_name": session_name or f"Chat {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M')}",
+            "created_at": firestore.SERVER_TIMESTAMP,
+            "updated_at": firestore.SERVER_TIMESTAMP,
+            "message_count": message_count,
+            "is_active": True,
+        }
+
     @with_retry
     def create_session(self, user_id: str, agent_engine_session_id: str, session_name: Optional[str] = None) -> str:
         """
@@ -290,18 +337,8 @@ class Database:
         Returns:
             session_id: Our internal session ID
         """
-        session_id = str(uuid.uuid4())
-
-        session_data = {
-            "session_id": session_id,
-            "user_id": user_id,
-            "agent_engine_session_id": agent_engine_session_id,
-            "session_name": session_name or f"Chat {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M')}",
-            "created_at": datetime.now(timezone.utc),
-            "updated_at": datetime.now(timezone.utc),
-            "message_count": 0,
-            "is_active": True,
-        }
+        session_data = self._new_session_data(user_id, agent_engine_session_id, session_name, message_count=0)
+        session_id = session_data["session_id"]
 
         self.db.collection("sessions").document(session_id).set(session_data)
         logger.info(f"Created session: {session_id} for user: {user_id}")
@@ -317,12 +354,21 @@ class Database:
             session_id: Session ID
 
         Returns:
-            Session data dict or None if not found
+            Session data dict or None if not found. Served from a short-lived
+            cache, so updated_at / message_count may lag behind chat writes;
+            ownership, agent_engine_session_id and is_active are always current
+            for writes made by this process.
         """
+        cached = self._session_cache.get(session_id)
+        if cached is not None:
+            return cached
+
         doc = self.db.collection("sessions").document(session_id).get()
 
         if doc.exists:
-            return doc.to_dict()
+            session_data = doc.to_dict()
+            self._session_cache.set(session_id, session_data)
+            return session_data
 
         return None
 
@@ -331,6 +377,10 @@ class Database:
         """
         Get all sessions for a user.
 
+        message_count is denormalized onto each session document (incremented
+        in the same batch that writes the messages), so this is one query with
+        no per-session counting.
+
         Args:
             user_id: User ID
             limit: Maximum number of sessions to return
@@ -338,27 +388,76 @@ class Database:
         Returns:
             List of session data dicts, ordered by updated_at desc
         """
-        # Simplified query - only filter by user_id to avoid composite index requirement
-        # We'll sort and filter active sessions in Python
+        # Filter, order and limit server-side. Requires the composite index
+        # sessions(user_id ASC, is_active ASC, updated_at DESC) — see
+        # terraform/modules/core/infrastructure.tf. Documents without
+        # is_active / updated_at never match; legacy sessions are backfilled
+        # by scripts/backfill_session_is_active.py.
         query = (
             self.db.collection("sessions")
             .where("user_id", "==", user_id)
-            .limit(limit * 2)  # Get more to account for inactive sessions
+            .where("is_active", "==", True)
+            .order_by("updated_at", direction=firestore.Query.DESCENDING)
+            .limit(limit)
         )
 
-        sessions = [doc.to_dict() for doc in query.stream()]
-
-        # Filter for active sessions and sort by updated_at
-        active_sessions = [s for s in sessions if s.get("is_active", True)]
-        active_sessions.sort(key=lambda x: x.get("updated_at", datetime.min.replace(tzinfo=timezone.utc)), reverse=True)
-
-        # Limit to requested number
-        result = active_sessions[:limit]
+        result = [doc.to_dict() for doc in query.stream()]
 
         logger.info(f"Found {len(result)} active sessions for user: {user_id}")
 
         return result
 
+    @with_retry
+    def get_user_sessions_version(self, user_id: str) -> Optional[datetime]:
+        """
+        Get the latest updated_at across all of a user's sessions.
+
+        Every session write (create, chat, rename, soft delete) bumps
+        updated_at, so this changes whenever get_user_sessions would. Deleted
+        sessions are included on purpose: deleting bumps their updated_at.
+        Reads a single field from a single document.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Latest updated_at, or None if the user has no sessions
+        """
+        # Requires the composite index sessions(user_id ASC, updated_at DESC)
+        query = (
+            self.db.collection("sessions")
+            .where("user_id", "==", user_id)
+            .order_by("updated_at", direction=firestore.Query.DESCENDING)
+            .select(["updated_at"])
+            .limit(1)
+        )
+
+        for doc in query.stream():
+            return doc.to_dict().get("updated_at")
+        return None
+
+    @with_retry
+    def get_session_version(self, session_id: str) -> Optional[Tuple[Optional[datetime], int]]:
+        """
+        Get (updated_at, message_count) for a session, bypassing the session cache.
+
+        Used to validate cached message history; a single-document read of
+        two fields.
+
+        Args:
+            session_id: Session ID
+
+        Returns:
+            (updated_at, message_count) tuple, or None if the session does not exist
+        """
+        doc = self.db.collection("sessions").document(session_id).get(field_paths=["updated_at", "message_count"])
+
+        if not doc.exists:
+            return None
+
+        data = doc.to_dict()
+        return data.get("updated_at"), data.get("message_count", 0)
+
     @with_retry
     def update_session(self, session_id: str):
         """
@@ -369,10 +468,11 @@ class Database:
         """
         self.db.collection("sessions").document(session_id).update(
             {
-                "updated_at": datetime.now(timezone.utc),
+                "updated_at": firestore.SERVER_TIMESTAMP,
                 "message_count": firestore.Increment(1),
             }
         )
+        self._session_cache.pop(session_id)
 
     @with_retry
     def rename_session(self, session_id: str, new_name: str):
@@ -386,9 +486,10 @@ class Database:
         self.db.collection("sessions").document(session_id).update(
             {
                 "session_name": new_name,
-                "updated_at": datetime.now(timezone.utc),
+                "updated_at": firestore.SERVER_TIMESTAMP,
             }
         )
+        self._session_cache.pop(session_id)
         logger.info(f"Renamed session {session_id} to: {new_name}")
 
     @with_retry
@@ -402,9 +503,10 @@ class Database:
         self.db.collection("sessions").document(session_id).update(
             {
                 "is_active": False,
-                "updated_at": datetime.now(timezone.utc),
+                "updated_at": firestore.SERVER_TIMESTAMP,
             }
         )
+        self._session_cache.pop(session_id)
         logger.info(f"Deleted session: {session_id}")
 
     # =========================================================================
@@ -412,12 +514,8 @@ class Database:
     # =========================================================================
 
     @with_retry
-    def create_token(self, user_id: str) -> str:
-        """Generate and persist an auth token for user_id. Returns the token."""
-        import secrets
-        from datetime import timedelta
-
-        token = secrets.token_urlsafe(32)
+    def create_token(self, user_id: str, token: str):
+        """Persist an auth token (see app.auth.generate_token) for user_id."""
         self.db.collection("tokens").document(token).set(
             {
                 "user_id": user_id,
@@ -426,7 +524,6 @@ class Database:
             }
         )
         logger.info("Token created", user_id=user_id)
-        return token
 
     @with_retry
     def verify_token(self, token: str) -> Optional[str]:
@@ -473,39 +570,176 @@ class Database:
             "session_id": session_id,
             "role": role,
             "content": content,
-            "timestamp": datetime.now(timezone.utc),
+            "timestamp": firestore.SERVER_TIMESTAMP,
         }
 
         # Store in subcollection: sessions/{session_id}/messages/{message_id}
         self.db.collection("sessions").document(session_id).collection("messages").document(message_id).set(
             message_data
         )
+        # Server-stamped, so the cached transcript can't be extended locally
+        self._message_cache.pop(session_id)
 
         logger.info(f"Saved {role} message to session {session_id}")
 
         return message_id
 
+    def _new_messages(self, session_id: str, messages: List[Tuple[str, str]]) -> List[Dict]:
+        """Build message dicts with their IDs and timestamps fixed. Returns them in order."""
+        now = datetime.now(timezone.utc)
+        return [
+            {
+                "message_id": str(uuid.uuid4()),
+                "session_id": session_id,
+                "role": role,
+                "content": content,
+                # Offset by index so messages written together keep their order
+                "timestamp": now + timedelta(microseconds=index),
+            }
+            for index, (role, content) in enumerate(messages)
+        ]
+
+    def _set_messages(self, batch, session_id: str, written: List[Dict]) -> None:
+        """Add writes for pre-built messages (see _new_messages) to a batch."""
+        messages_ref = self.db.collection("sessions").document(session_id).collection("messages")
+        for message_data in written:
+            batch.set(messages_ref.document(message_data["message_id"]), message_data)
+
+    def _append_cached_messages(self, session_id: str, written: List[Dict]) -> None:
+        """Extend a cached transcript with messages just committed by this process."""
+        self._message_cache.update(session_id, lambda cached: cached + written)
+
+    def commit_chat_writes(self, session_id: str, user_message: str, assistant_message: str) -> List[str]:
+        """
+        Persist one chat exchange atomically in a single round-trip.
+
+        Writes the user and assistant messages and bumps the session's
+        updated_at / message_count in the same WriteBatch. The message IDs are
+        generated once, before the retried commit, and the message documents
+        are created rather than set: if a commit succeeds server-side but its
+        response is lost, the retry fails with AlreadyExists instead of
+        incrementing message_count a second time.
+
+        Args:
+            session_id: Session ID
+            user_message: The user's message
+            assistant_message: The agent's response
+
+        Returns:
+            message_ids: [user_message_id, assistant_message_id]
+        """
+        written = self._new_messages(session_id, [("user", user_message), ("assistant", assistant_message)])
+        self._commit_chat_batch(session_id, written)
+        self._append_cached_messages(session_id, written)
+        logger.info(f"Committed chat exchange to session {session_id}")
+
+        return [message["message_id"] for message in written]
+
     @with_retry
-    def get_session_messages(self, session_id: str, limit: int = 100) -> List[Dict]:
+    def _commit_chat_batch(self, session_id: str, written: List[Dict]) -> None:
+        """Create the messages and bump the session counters in one batch (applied at most once)."""
+        messages_ref = self.db.collection("sessions").document(session_id).collection("messages")
+        batch = self.db.batch()
+        for message_data in written:
+            batch.create(messages_ref.document(message_data["message_id"]), message_data)
+        batch.update(
+            self.db.collection("sessions").document(session_id),
+            {
+                "updated_at": firestore.SERVER_TIMESTAMP,
+                "message_count": firestore.Increment(len(written)),
+            },
+        )
+        try:
+            batch.commit()
+        except gcp_exceptions.AlreadyExists:
+            # The message IDs are fresh uuids, so this is an earlier attempt
+            # that committed before its response was lost
+            logger.info(f"Chat exchange already committed to session {session_id}")
+
+    def create_session_with_messages(
+        self, user_id: str, agent_engine_session_id: str, user_message: str, assistant_message: str
+    ) -> str:
         """
-        Get all messages for a session.
+        Create a session together with its first chat exchange in one WriteBatch.
+
+        Used for the first message of a conversation, so the session document
+        and both messages cost a single round-trip instead of two. The session
+        and message IDs are generated once, before the retried commit, so a
+        retry rewrites the same documents instead of creating a second session.
+
+        Args:
+            user_id: User ID who owns this session
+            agent_engine_session_id: The session ID from Agent Engine
+            user_message: The user's first message
+            assistant_message: The agent's response
+
+        Returns:
+            session_id: Our internal session ID
+        """
+        session_data = self._new_session_data(user_id, agent_engine_session_id, None, message_count=2)
+        session_id = session_data["session_id"]
+        written = self._new_messages(session_id, [("user", user_message), ("assistant", assistant_message)])
+        self._commit_new_session(session_data, written)
+
+        # The transcript is complete by construction
+        self._message_cache.set(session_id, written)
+        logger.info(f"Created session: {session_id} for user: {user_id} with first exchange")
+
+        return session_id
+
+    @with_retry
+    def _commit_new_session(self, session_data: Dict, written: List[Dict]) -> None:
+        """Write a new session and its messages in one batch (idempotent: every document is set)."""
+        session_id = session_data["session_id"]
+        batch = self.db.batch()
+        batch.set(self.db.collection("sessions").document(session_id), session_data)
+        self._set_messages(batch, session_id, written)
+        batch.commit()
+
+    @with_retry
+    def get_session_messages(
+        self,
+        session_id: str,
+        limit: int = 100,
+        before: Optional[datetime] = None,
+        message_count: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        Get a page of messages for a session (keyset pagination).
+
+        Returns the newest `limit` messages, or the newest `limit` messages
+        older than `before` when paging back through a long conversation.
+
+        The cached transcript only reflects writes made by this process, so it
+        is served only when it holds exactly `message_count` messages (the
+        session's current count, from get_session_version). Without a count
+        the messages are always read from Firestore.
 
         Args:
             session_id: Session ID
             limit: Maximum number of messages to return
+            before: Only return messages with a timestamp earlier than this
+            message_count: The session's current message_count
 
         Returns:
             List of message dicts, ordered by timestamp asc
         """
-        query = (
-            self.db.collection("sessions")
-            .document(session_id)
-            .collection("messages")
-            .order_by("timestamp")
-            .limit(limit)
-        )
+        if before is None and message_count is not None:
+            cached = self._message_cache.get(session_id)
+            if cached is not None and len(cached) == message_count:
+                return cached[-limit:]
+
+        query = self.db.collection("sessions").document(session_id).collection("messages")
+        if before is not None:
+            query = query.where("timestamp", "<", before)
+        query = query.order_by("timestamp", direction=firestore.Query.DESCENDING).limit(limit)
 
         messages = [doc.to_dict() for doc in query.stream()]
+        messages.reverse()
+
+        # Only a first page shorter than the limit is the complete transcript
+        if before is None and len(messages) < limit:
+            self._message_cache.set(session_id, messages)
 
         logger.info(f"Retrieved {len(messages)} messages for session {session_id}")
 
@@ -1,15 +1,30 @@
+import asyncio
+import hashlib
+import json
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+from email.utils import formatdate
 from pathlib import Path
 from typing import Optional
 
-from fastapi import Depends, FastAPI, Header, HTTPException
+import orjson
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import (
+    FileResponse,
+    JSONResponse,
+    ORJSONResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
+from starlette.convertors import PathConvertor, register_url_convertor
 
-from . import auth
-from .agent_client import agent_client
+from . import auth, session_owner_cache
+from .agent_client import NO_RESPONSE_FALLBACK, agent_client
 from .config import settings
 from .database import get_database
 from .health import HealthChecker, HealthStatus, liveness_check, readiness_check
@@ -25,9 +40,12 @@ from .models import (
     MessageInfo,
     RegisterRequest,
     RenameSessionRequest,
+    SessionInfo,
     SessionListResponse,
 )
 from .rate_limiter import RateLimitDependency
+from .redis_client import close_redis
+from .static_files import ImmutableStaticFiles
 
 # Initialize structured logging
 # Use JSON format in production, human-readable in development
@@ -59,41 +77,51 @@ if _MODEL_ARMOR_ENABLED and _MODEL_ARMOR_TEMPLATE_ID:
 # Initialize database
 db = get_database(project_id=settings.google_cloud_project, database_id="customer-support-db")
 
-# Initialize health checker (agent_client added after import)
-health_checker = HealthChecker(db=db, agent_client=None)
+# Initialize health checker
+health_checker = HealthChecker(db=db, agent_client=agent_client)
 
-app = FastAPI(
-    title="Customer Support AI Backend",
-    description="Backend API for Customer Support Multi-Agent System with User Management",
-    version="2.0.0",
-)
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[settings.frontend_url, "http://localhost:3000", "http://localhost:5173"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# =============================================================================
+# APPLICATION LIFECYCLE
+# =============================================================================
 
-# Add logging middleware for request context
-app.middleware("http")(logging_middleware)
+# Upper bound on connection warm-up so a slow dependency can't stall startup
+STARTUP_WARMUP_TIMEOUT_SECONDS = 15.0
 
-# Add metrics middleware for request tracking
-app.middleware("http")(metrics_middleware)
+# The Firestore client is synchronous, so handlers run Database calls through
+# asyncio.to_thread instead of blocking the event loop. This bounds how many
+# run at once (they share one multiplexed gRPC channel, so no per-call connect).
+DB_THREADPOOL_SIZE = 32
 
 
-# =============================================================================
-# APPLICATION LIFECYCLE EVENTS
-# =============================================================================
+async def _warm_up_connections():
+    """
+    Open the Firestore and Agent Engine connections before serving traffic.
+
+    Both clients connect lazily, so without this the first chat request on a
+    fresh instance pays for the Firestore channel handshake and the blocking
+    Agent Engine lookup. Failures are logged only; requests retry lazily.
+    """
+    try:
+        async with asyncio.timeout(STARTUP_WARMUP_TIMEOUT_SECONDS):
+            db_health, _ = await asyncio.gather(
+                health_checker.check_database(),
+                asyncio.to_thread(agent_client.warm_up),
+            )
+        logger.info("Connections warmed up", database=db_health.status.value)
+    except asyncio.TimeoutError:
+        logger.warning("Connection warm-up timed out", timeout_seconds=STARTUP_WARMUP_TIMEOUT_SECONDS)
 
 
-@app.on_event("startup")
-async def startup_event():
+@asynccontextmanager
+async def lifespan(app: FastAPI):
     """
-    Application startup handler.
+    Application startup and graceful shutdown.
 
-    Initializes resources and logs startup information.
+    Startup: logs startup information, sets initial metrics and warms up
+    connections. Shutdown: logs final metrics and closes pooled Agent Engine
+    channels and Redis connections. Uvicorn waits for in-flight requests
+    before shutdown runs (--timeout-graceful-shutdown, default 30s).
     """
     logger.info(
         "Application starting up",
@@ -105,17 +133,13 @@ async def startup_event():
     # Set initial metrics
     metrics.set_gauge("app_info", 1)
 
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=DB_THREADPOOL_SIZE, thread_name_prefix="db")
+    )
+    await _warm_up_connections()
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    """
-    Graceful shutdown handler.
+    yield
 
-    Ensures clean shutdown of resources:
-    - Logs shutdown event
-    - Allows in-flight requests to complete (handled by uvicorn)
-    - Could close database connections if needed
-    """
     logger.info("Application shutting down - starting graceful shutdown")
 
     # Log final metrics before shutdown
@@ -127,34 +151,77 @@ async def shutdown_event():
         uptime_seconds=final_metrics["uptime_seconds"],
     )
 
-    # Note: Uvicorn handles waiting for in-flight requests by default
-    # with its --timeout-graceful-shutdown option (default 30s)
+    # Release pooled connections (Redis is a no-op when not configured)
+    await agent_client.close()
+    await close_redis()
 
     logger.info("Graceful shutdown complete")
 
 
+app = FastAPI(
+    title="Customer Support AI Backend",
+    description="Backend API for Customer Support Multi-Agent System with User Management",
+    version="2.0.0",
+    # orjson encodes responses in native code, much faster than stdlib json for message lists
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=[settings.frontend_url, "http://localhost:3000", "http://localhost:5173"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# Add logging middleware for request context
+app.middleware("http")(logging_middleware)
+
+# Add metrics middleware for request tracking
+app.middleware("http")(metrics_middleware)
+
+
 # =============================================================================
 # AUTHENTICATION DEPENDENCY
 # =============================================================================
 
 
-def get_current_user(authorization: Optional[str] = Header(None)) -> Optional[str]:
+def bearer_token(http_request: Request) -> Optional[str]:
     """
-    Extract user_id from Authorization header.
+    Parse an "Authorization: Bearer <token>" header.
+
+    Reads the raw Starlette headers directly rather than declaring a Header()
+    parameter, which skips FastAPI's per-request parameter validation.
 
     Returns:
-        user_id if authenticated, None if anonymous
+        The token, or None if the header is absent
+
+    Raises:
+        HTTPException 401: If the header is present but not a bearer token
     """
+    authorization = http_request.headers.get("authorization")
     if not authorization:
         return None
 
-    # Expected format: "Bearer <token>"
-    parts = authorization.split()
-    if len(parts) != 2 or parts[0].lower() != "bearer":
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
         raise HTTPException(status_code=401, detail="Invalid authorization header")
 
-    token = parts[1]
-    user_id = db.verify_token(token)
+    return token
+
+
+async def get_current_user(token: Optional[str] = Depends(bearer_token)) -> Optional[str]:
+    """
+    Extract user_id from Authorization header.
+
+    Returns:
+        user_id if authenticated, None if anonymous
+    """
+    if token is None:
+        return None
+
+    user_id = await auth.verify_token(db, token)
 
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
@@ -162,6 +229,31 @@ def get_current_user(authorization: Optional[str] = Header(None)) -> Optional[st
     return user_id
 
 
+async def require_user_id(http_request: Request, user_id: Optional[str] = Depends(get_current_user)) -> str:
+    """
+    Resolve the caller's user_id, or reject the request.
+
+    Supports both:
+    - Authenticated users (via Authorization: Bearer token header)
+    - Anonymous users (via X-User-Id header with anon-* user_id)
+
+    Returns:
+        user_id (auth takes precedence over X-User-Id)
+
+    Raises:
+        HTTPException 401: If neither header identifies a user
+    """
+    user_id = user_id or http_request.headers.get("x-user-id")
+
+    if not user_id:
+        raise HTTPException(
+            status_code=401,
+            detail="Authentication required. Use Authorization header or X-User-Id for anonymous users.",
+        )
+
+    return user_id
+
+
 @app.get("/health")
 async def health_check():
     """
@@ -175,11 +267,6 @@ async def health_check():
         - 200: All systems healthy
         - 503: System degraded or unhealthy
     """
-    from fastapi.responses import JSONResponse
-
-    # Update health checker with agent client if available
-    health_checker.agent_client = agent_client
-
     result = await health_checker.check_all()
 
     # Return 503 if unhealthy
@@ -207,9 +294,6 @@ async def readiness_probe():
     Returns 200 if service can handle requests.
     Used to determine if pod should receive traffic.
     """
-    from fastapi.responses import JSONResponse
-
-    health_checker.agent_client = agent_client
     result = await readiness_check(health_checker)
 
     status_code = 200 if result["ready"] else 503
@@ -239,8 +323,6 @@ async def get_prometheus_metrics():
 
     Use this endpoint for Prometheus scraping.
     """
-    from fastapi.responses import PlainTextResponse
-
     return PlainTextResponse(content=metrics.get_prometheus_format(), media_type="text/plain")
 
 
@@ -255,11 +337,15 @@ async def register(request: RegisterRequest, _rate_check: bool = Depends(RateLim
     try:
         # Hash password and create user
         # Note: create_user() handles demo email validation and duplicate check
-        password_hash = auth.hash_password(request.password)
-        user_id = db.create_user(email=request.email, name=request.name, password_hash=password_hash)
+        password_hash = await asyncio.to_thread(
+            auth.hash_password, request.password.get_secret_value().encode("utf-8")
+        )
+        user_id = await asyncio.to_thread(
+            db.create_user, email=request.email, name=request.name, password_hash=password_hash
+        )
 
         # Generate auth token
-        token = db.create_token(user_id)
+        token = await auth.create_token(db, user_id)
 
         logger.info("User registered", user_id=user_id, email=request.email)
 
@@ -281,19 +367,25 @@ async def login(request: LoginRequest, _rate_check: bool = Depends(RateLimitDepe
     """Login with email and password."""
     try:
         # Get user by email
-        user = db.get_user_by_email(request.email)
+        user = await asyncio.to_thread(db.get_user_by_email, request.email)
         if not user:
             raise HTTPException(status_code=401, detail="Invalid email or password")
 
-        # Verify password
-        if not auth.verify_password(request.password, user["password_hash"]):
+        # Verify password (encoded once; reused for a possible rehash below)
+        password = request.password.get_secret_value().encode("utf-8")
+        if not await asyncio.to_thread(auth.verify_password, password, user["password_hash"]):
             raise HTTPException(status_code=401, detail="Invalid email or password")
 
+        # Upgrade legacy bcrypt hashes to Argon2id now that we have the plaintext
+        if auth.needs_rehash(user["password_hash"]):
+            new_hash = await asyncio.to_thread(auth.hash_password, password)
+            await asyncio.to_thread(db.update_password_hash, user["user_id"], user["email"], new_hash)
+
         # Update last login
-        db.update_last_login(user["user_id"])
+        await asyncio.to_thread(db.update_last_login, user["user_id"])
 
         # Generate auth token
-        token = db.create_token(user["user_id"])
+        token = await auth.create_token(db, user["user_id"])
 
         logger.info("User logged in", user_id=user["user_id"], email=request.email)
 
@@ -310,7 +402,7 @@ async def login(request: LoginRequest, _rate_check: bool = Depends(RateLimitDepe
 async def create_anonymous(_rate_check: bool = Depends(RateLimitDependency("auth"))):
     """Create an anonymous user (for users who don't want to register)."""
     try:
-        user_id = db.create_anonymous_user()
+        user_id = await asyncio.to_thread(db.create_anonymous_user)
 
         return AnonymousUserResponse(user_id=user_id, is_anonymous=True)
 
@@ -320,35 +412,125 @@ async def create_anonymous(_rate_check: bool = Depends(RateLimitDependency("auth
 
 
 @app.post("/api/auth/logout")
-async def logout(authorization: str = Header(...)):
+async def logout(token: Optional[str] = Depends(bearer_token)):
     """Logout (revoke token)."""
-    try:
-        # Extract token
-        parts = authorization.split()
-        if len(parts) == 2 and parts[0].lower() == "bearer":
-            token = parts[1]
-            db.revoke_token(token)
-            return {"status": "logged_out"}
+    if token is None:
+        raise HTTPException(status_code=401, detail="Missing authorization header")
 
-        raise HTTPException(status_code=400, detail="Invalid authorization header")
+    try:
+        await auth.revoke_token(db, token)
+        return {"status": "logged_out"}
 
-    except HTTPException:
-        raise
     except Exception as e:
         logger.error("Logout error", error=str(e))
         raise HTTPException(status_code=500, detail="Logout failed")
 
 
 # =============================================================================
-# CHAT ENDPOINT
+# CHAT ENDPOINTS
 # =============================================================================
 
 
+async def _resolve_chat_session(session_id: Optional[str], user_id: str) -> tuple[Optional[str], Optional[str]]:
+    """
+    Look up an existing chat session and verify ownership.
+
+    Returns:
+        (internal_session_id, agent_engine_session_id), both None for a new session
+    """
+    if not session_id:
+        logger.info("Creating new session")
+        return None, None
+
+    session = await asyncio.to_thread(db.get_session, session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if session["user_id"] != user_id:
+        raise HTTPException(status_code=403, detail="Session does not belong to user")
+
+    logger.info("Using existing session", session_id=session_id)
+    return session_id, session["agent_engine_session_id"]
+
+
+def _screen_user_prompt(message: str) -> None:
+    """Model Armor safety check — screen user prompt before sending to agent."""
+    if not (_model_armor_client and _MODEL_ARMOR_TEMPLATE_ID):
+        return
+
+    try:
+        ma_response = _model_armor_client.sanitize_user_prompt(
+            request=_modelarmor_v1.SanitizeUserPromptRequest(
+                name=_MODEL_ARMOR_TEMPLATE_ID,
+                user_prompt_data=_modelarmor_v1.DataItem(text=message),
+            )
+        )
+        violations = _parse_ma_response(ma_response)
+        if violations:
+            if _MODEL_ARMOR_MODE == "INSPECT_AND_BLOCK":
+                logger.warning("Model Armor blocked user prompt", violations=str(violations))
+                raise HTTPException(
+                    status_code=400,
+                    detail="I'm sorry, I can't process this request as it violates our safety policy. Please contact support if you need assistance.",
+                )
+            else:
+                logger.info("Model Armor flagged user prompt (INSPECT_ONLY — not blocked)", violations=str(violations))
+    except HTTPException:
+        raise
+    except Exception as ma_err:
+        logger.error("Model Armor check error (failing open)", error=str(ma_err))
+
+
+async def _screen_and_open_agent_session(agent_engine_session_id: Optional[str], user_id: str, message: str) -> str:
+    """
+    Screen the prompt and make sure an Agent Engine session exists.
+
+    For a new conversation the session is created while Model Armor screens
+    the prompt, so the two round trips overlap instead of running back to back.
+
+    Returns:
+        agent_engine_session_id
+    """
+    if agent_engine_session_id:
+        await asyncio.to_thread(_screen_user_prompt, message)
+        return agent_engine_session_id
+
+    session_task = asyncio.create_task(agent_client.create_session(user_id))
+    try:
+        await asyncio.to_thread(_screen_user_prompt, message)
+    except BaseException:
+        # Blocked prompt: the session is never used, don't wait for it
+        session_task.cancel()
+        raise
+
+    return await session_task
+
+
+async def _save_chat_exchange(
+    internal_session_id: Optional[str], user_id: str, agent_engine_session_id: str, message: str, response_text: str
+) -> str:
+    """Create the session if needed and persist the exchange. Returns the internal session ID."""
+    # New session: session document and both messages go in one batched commit
+    if not internal_session_id:
+        internal_session_id = await asyncio.to_thread(
+            db.create_session_with_messages, user_id, agent_engine_session_id, message, response_text
+        )
+        logger.info("Created new session", session_id=internal_session_id)
+        return internal_session_id
+
+    # Save messages for UI display and bump session metadata (one batched commit)
+    await asyncio.to_thread(db.commit_chat_writes, internal_session_id, message, response_text)
+    return internal_session_id
+
+
+def _sse_event(payload: dict) -> str:
+    """Format a payload as a Server-Sent Events data frame."""
+    return f"data: {json.dumps(payload)}\n\n"
+
+
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
-    user_id: Optional[str] = Depends(get_current_user),
-    x_user_id: Optional[str] = Header(None),
+    user_id: str = Depends(require_user_id),
     _rate_check: bool = Depends(RateLimitDependency("chat")),
 ):
     """
@@ -360,94 +542,76 @@ async def chat(
 
     Args:
         request: ChatRequest with message and optional session_id
-        user_id: Extracted from Authorization header (if authenticated)
-        x_user_id: Extracted from X-User-Id header (if anonymous)
+        user_id: From the Authorization token, or X-User-Id for anonymous users
 
     Returns:
         ChatResponse with agent response, user_id, and session_id
     """
     try:
-        # Determine user_id (auth takes precedence over anonymous)
-        actual_user_id = user_id or x_user_id
-
-        if not actual_user_id:
-            raise HTTPException(
-                status_code=401,
-                detail="Authentication required. Use Authorization header or X-User-Id for anonymous users.",
-            )
-
         # Set user context for logging
-        set_request_context(user_id=actual_user_id, session_id=request.session_id)
+        set_request_context(user_id=user_id, session_id=request.session_id)
         logger.info("Chat request received", message_preview=request.message[:50])
 
         # Track chat request metric
         increment_chat_requests()
 
         # Check if this is a new session or existing one
-        if request.session_id:
-            # Verify session belongs to user
-            session = db.get_session(request.session_id)
-            if not session:
-                raise HTTPException(status_code=404, detail="Session not found")
-            if session["user_id"] != actual_user_id:
-                raise HTTPException(status_code=403, detail="Session does not belong to user")
-
-            internal_session_id = request.session_id
-            agent_engine_session_id = session["agent_engine_session_id"]
-
-            logger.info("Using existing session", session_id=internal_session_id)
-        else:
-            # Create new session
-            internal_session_id = None
-            agent_engine_session_id = None
-            logger.info("Creating new session")
-
-        # Model Armor safety check — screen user prompt before sending to agent
-        if _model_armor_client and _MODEL_ARMOR_TEMPLATE_ID:
-            try:
-                ma_response = _model_armor_client.sanitize_user_prompt(
-                    request=_modelarmor_v1.SanitizeUserPromptRequest(
-                        name=_MODEL_ARMOR_TEMPLATE_ID,
-                        user_prompt_data=_modelarmor_v1.DataItem(text=request.message),
-                    )
-                )
-                violations = _parse_ma_response(ma_response)
-                if violations:
-                    if _MODEL_ARMOR_MODE == "INSPECT_AND_BLOCK":
-                        logger.warning("Model Armor blocked user prompt", violations=str(violations))
-                        raise HTTPException(
-                            status_code=400,
-                            detail="I'm sorry, I can't process this request as it violates our safety policy. Please contact support if you need assistance.",
-                        )
-                    else:
-                        logger.info(
-                            "Model Armor flagged user prompt (INSPECT_ONLY — not blocked)", violations=str(violations)
-                        )
-            except HTTPException:
-                raise
-            except Exception as ma_err:
-                logger.error("Model Armor check error (failing open)", error=str(ma_err))
+        internal_session_id, agent_engine_session_id = await _resolve_chat_session(request.session_id, user_id)
+
+        agent_engine_session_id = await _screen_and_open_agent_session(
+            agent_engine_session_id, user_id, request.message
+        )
 
         # Query the agent
         response_text, agent_engine_session_id = await agent_client.query_agent(
-            user_id=actual_user_id, agent_engine_session_id=agent_engine_session_id, message=request.message
+            user_id=user_id, agent_engine_session_id=agent_engine_session_id, message=request.message
         )
 
-        # If new session, create it in database
-        if not internal_session_id:
-            internal_session_id = db.create_session(
-                user_id=actual_user_id, agent_engine_session_id=agent_engine_session_id
-            )
-            logger.info("Created new session", session_id=internal_session_id)
-        else:
-            # Update existing session
-            db.update_session(internal_session_id)
+        internal_session_id = await _save_chat_exchange(
+            internal_session_id, user_id, agent_engine_session_id, request.message, response_text
+        )
+
+        return ChatResponse(response=response_text, user_id=user_id, session_id=internal_session_id)
+
+    except HTTPException:
+        increment_chat_errors()
+        raise
+    except TimeoutError as e:
+        increment_chat_errors()
+        logger.warning("Chat request timed out", error=str(e))
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        increment_chat_errors()
+        logger.error("Error processing chat request", error=str(e), exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
-        # Save messages to database for UI display
-        db.save_message(internal_session_id, "user", request.message)
-        db.save_message(internal_session_id, "assistant", response_text)
 
-        return ChatResponse(response=response_text, user_id=actual_user_id, session_id=internal_session_id)
+@app.post("/api/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    user_id: str = Depends(require_user_id),
+    _rate_check: bool = Depends(RateLimitDependency("chat")),
+):
+    """
+    Send a message to the agent and stream the reply as Server-Sent Events.
+
+    Same authentication and session handling as POST /api/chat. Each frame is
+    a JSON object on a "data:" line:
+    - {"delta": "..."}: a chunk of response text, as soon as it is generated
+    - {"done": true, "user_id": "...", "session_id": "..."}: final frame
+    - {"error": "...", "status_code": 504}: the agent failed mid-stream
+    """
+    try:
+        set_request_context(user_id=user_id, session_id=request.session_id)
+        logger.info("Streaming chat request received", message_preview=request.message[:50])
+        increment_chat_requests()
+
+        internal_session_id, agent_engine_session_id = await _resolve_chat_session(request.session_id, user_id)
+
+        # Create the Agent Engine session up front so failures still map to HTTP errors
+        agent_engine_session_id = await _screen_and_open_agent_session(
+            agent_engine_session_id, user_id, request.message
+        )
 
     except HTTPException:
         increment_chat_errors()
@@ -461,32 +625,81 @@ async def chat(
         logger.error("Error processing chat request", error=str(e), exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
+    async def event_stream():
+        # Buffer chunks for the database write; joined once at the end
+        parts = []
+        try:
+            async for text in agent_client.stream_query(user_id, agent_engine_session_id, request.message):
+                parts.append(text)
+                yield _sse_event({"delta": text})
+
+            response_text = "".join(parts) or NO_RESPONSE_FALLBACK
+            if not parts:
+                yield _sse_event({"delta": response_text})
+
+            session_id = await _save_chat_exchange(
+                internal_session_id, user_id, agent_engine_session_id, request.message, response_text
+            )
+            yield _sse_event({"done": True, "user_id": user_id, "session_id": session_id})
+
+        except TimeoutError as e:
+            increment_chat_errors()
+            logger.warning("Streaming chat request timed out", error=str(e))
+            yield _sse_event({"error": str(e), "status_code": 504})
+        except Exception as e:
+            increment_chat_errors()
+            logger.error("Error streaming chat response", error=str(e), exc_info=True)
+            yield _sse_event({"error": f"Error processing request: {str(e)}", "status_code": 500})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 # =============================================================================
 # SESSION MANAGEMENT ENDPOINTS
 # =============================================================================
 
 
+def _make_etag(*parts) -> str:
+    """Build a weak ETag from version parts (timestamps, counts, query params)."""
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def _version_timestamp(value: Optional[datetime]) -> float:
+    return value.timestamp() if value else 0.0
+
+
 @app.get("/api/sessions", response_model=SessionListResponse)
 async def list_sessions(
-    user_id: Optional[str] = Depends(get_current_user),
-    x_user_id: Optional[str] = Header(None),
+    http_request: Request,
+    response: Response,
+    user_id: str = Depends(require_user_id),
     _rate_check: bool = Depends(RateLimitDependency("sessions")),
 ):
-    """Get all sessions for the current user."""
-    try:
-        actual_user_id = user_id or x_user_id
-
-        if not actual_user_id:
-            raise HTTPException(status_code=401, detail="Authentication required")
+    """
+    Get all sessions for the current user.
 
-        sessions = db.get_user_sessions(actual_user_id)
+    Returns an ETag derived from the user's newest session write. A repeat
+    request with a matching If-None-Match gets 304 after a single-field
+    version read, without running the session list query.
+    """
+    try:
+        version = await asyncio.to_thread(db.get_user_sessions_version, user_id)
+        etag = _make_etag(user_id, _version_timestamp(version))
+        cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if http_request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=cache_headers)
 
-        from .models import SessionInfo
+        sessions = await asyncio.to_thread(db.get_user_sessions, user_id)
 
-        session_list = [SessionInfo(**session) for session in sessions]
+        # Trusted Firestore documents: skip input validation (the response model still serializes)
+        session_list = [SessionInfo.model_construct(**session) for session in sessions]
 
-        return SessionListResponse(user_id=actual_user_id, sessions=session_list)
+        response.headers.update(cache_headers)
+        return SessionListResponse(user_id=user_id, sessions=session_list)
 
     except HTTPException:
         raise
@@ -495,29 +708,39 @@ async def list_sessions(
         raise HTTPException(status_code=500, detail="Failed to list sessions")
 
 
+async def _verify_session_owner(session_id: str, user_id: str) -> None:
+    """
+    Verify a session belongs to user_id (404 if missing, 403 if not owned).
+
+    Checks the Redis ownership cache first and only reads the session
+    document on a miss (Database.get_session is itself cached per process).
+    Firestore has no conditional "UPDATE ... WHERE user_id = ?", so with a
+    warm cache this check plus the write is the single round-trip.
+    """
+    owner = await session_owner_cache.get_owner(session_id)
+    if owner is None:
+        session = await asyncio.to_thread(db.get_session, session_id)
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+        owner = session["user_id"]
+        await session_owner_cache.set_owner(session_id, owner)
+
+    if owner != user_id:
+        raise HTTPException(status_code=403, detail="Session does not belong to user")
+
+
 @app.put("/api/sessions/{session_id}/rename")
 async def rename_session(
     session_id: str,
     request: RenameSessionRequest,
-    user_id: Optional[str] = Depends(get_current_user),
-    x_user_id: Optional[str] = Header(None),
+    user_id: str = Depends(require_user_id),
     _rate_check: bool = Depends(RateLimitDependency("sessions")),
 ):
     """Rename a session."""
     try:
-        actual_user_id = user_id or x_user_id
-
-        if not actual_user_id:
-            raise HTTPException(status_code=401, detail="Authentication required")
-
-        # Verify session belongs to user
-        session = db.get_session(session_id)
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
-        if session["user_id"] != actual_user_id:
-            raise HTTPException(status_code=403, detail="Session does not belong to user")
+        await _verify_session_owner(session_id, user_id)
 
-        db.rename_session(session_id, request.session_name)
+        await asyncio.to_thread(db.rename_session, session_id, request.session_name)
 
         return {"status": "success", "session_id": session_id}
 
@@ -531,25 +754,15 @@ async def rename_session(
 @app.delete("/api/sessions/{session_id}")
 async def delete_session(
     session_id: str,
-    user_id: Optional[str] = Depends(get_current_user),
-    x_user_id: Optional[str] = Header(None),
+    user_id: str = Depends(require_user_id),
     _rate_check: bool = Depends(RateLimitDependency("sessions")),
 ):
     """Delete a session."""
     try:
-        actual_user_id = user_id or x_user_id
+        await _verify_session_owner(session_id, user_id)
 
-        if not actual_user_id:
-            raise HTTPException(status_code=401, detail="Authentication required")
-
-        # Verify session belongs to user
-        session = db.get_session(session_id)
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
-        if session["user_id"] != actual_user_id:
-            raise HTTPException(status_code=403, detail="Session does not belong to user")
-
-        db.delete_session(session_id)
+        await asyncio.to_thread(db.delete_session, session_id)
+        await session_owner_cache.invalidate(session_id)
 
         return {"status": "deleted", "session_id": session_id}
 
@@ -563,29 +776,45 @@ async def delete_session(
 @app.get("/api/sessions/{session_id}/messages", response_model=MessageHistoryResponse)
 async def get_session_messages(
     session_id: str,
-    user_id: Optional[str] = Depends(get_current_user),
-    x_user_id: Optional[str] = Header(None),
+    http_request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=200, description="Maximum number of messages to return"),
+    before: Optional[datetime] = Query(None, description="Return messages older than this timestamp"),
+    user_id: str = Depends(require_user_id),
     _rate_check: bool = Depends(RateLimitDependency("sessions")),
 ):
-    """Get message history for a session."""
-    try:
-        actual_user_id = user_id or x_user_id
+    """
+    Get message history for a session, newest page first.
 
-        if not actual_user_id:
-            raise HTTPException(status_code=401, detail="Authentication required")
+    Messages within a page are in chronological order. To load older
+    messages, pass the timestamp of the oldest message received as `before`.
 
-        # Verify session belongs to user
-        session = db.get_session(session_id)
-        if not session:
+    Returns an ETag derived from the session's updated_at and message_count;
+    a matching If-None-Match gets 304 without reading the messages. The body
+    is read from Firestore, or from the transcript cache only when the cache
+    holds that same message_count, so it is never older than its ETag.
+    """
+    try:
+        await _verify_session_owner(session_id, user_id)
+
+        version = await asyncio.to_thread(db.get_session_version, session_id)
+        if version is None:
             raise HTTPException(status_code=404, detail="Session not found")
-        if session["user_id"] != actual_user_id:
-            raise HTTPException(status_code=403, detail="Session does not belong to user")
+        updated_at, message_count = version
+        etag = _make_etag(session_id, _version_timestamp(updated_at), message_count, limit, _version_timestamp(before))
+        cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if http_request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=cache_headers)
 
         # Get messages
-        messages = db.get_session_messages(session_id)
+        messages = await asyncio.to_thread(
+            db.get_session_messages, session_id, limit=limit, before=before, message_count=message_count
+        )
 
-        message_list = [MessageInfo(**msg) for msg in messages]
+        # Trusted Firestore documents: skip input validation (the response model still serializes)
+        message_list = [MessageInfo.model_construct(**msg) for msg in messages]
 
+        response.headers.update(cache_headers)
         return MessageHistoryResponse(session_id=session_id, messages=message_list)
 
     except HTTPException:
@@ -595,10 +824,9 @@ async def get_session_messages(
         raise HTTPException(status_code=500, detail="Failed to fetch messages")
 
 
-@app.get("/api")
-async def api_root():
-    """API root endpoint"""
-    return {
+# Constant, so serialized once at import instead of per request
+_API_ROOT_BYTES = orjson.dumps(
+    {
         "message": "Customer Support AI Backend v2.0",
         "docs": "/docs",
         "health": "/health",
@@ -610,6 +838,7 @@ async def api_root():
                 "logout": "POST /api/auth/logout",
             },
             "chat": "POST /api/chat",
+            "chat_stream": "POST /api/chat/stream",
             "sessions": {
                 "list": "GET /api/sessions",
                 "rename": "PUT /api/sessions/{id}/rename",
@@ -617,38 +846,82 @@ async def api_root():
             },
         },
     }
+)
+
+
+@app.get("/api")
+async def api_root():
+    """API root endpoint"""
+    return Response(_API_ROOT_BYTES, media_type="application/json")
 
 
 # Serve static frontend files
+class SPAPathConvertor(PathConvertor):
+    """Path convertor that never matches API/docs paths, so unknown API routes 404 in the router."""
+
+    regex = r"(?!api/|docs|openapi\.json).*"
+
+
+register_url_convertor("spa_path", SPAPathConvertor())
+
 static_dir = Path(__file__).parent.parent / "static"
 if static_dir.exists():
-    app.mount("/assets", StaticFiles(directory=static_dir / "assets"), name="assets")
+    app.mount("/assets", ImmutableStaticFiles(directory=static_dir / "assets"), name="assets")
+
+    # index.html is served for every SPA route, so read it once instead of
+    # stat/open/read per navigation. The frontend is baked into the image, so
+    # it cannot change while the process is running.
+    index_file = static_dir / "index.html"
+    index_html_bytes = index_file.read_bytes() if index_file.is_file() else None
+    index_etag = f'"{hashlib.blake2b(index_html_bytes, digest_size=8).hexdigest()}"' if index_html_bytes else None
+    index_last_modified = formatdate(index_file.stat().st_mtime, usegmt=True) if index_html_bytes else None
+
+    def _index_response(request: Request) -> Response:
+        """
+        Serve the cached index.html, or 304 if the client already has it.
+
+        If-None-Match takes precedence over If-Modified-Since (RFC 9110).
+        """
+        headers = {"ETag": index_etag, "Last-Modified": index_last_modified, "Cache-Control": "no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            not_modified = if_none_match == index_etag
+        else:
+            not_modified = request.headers.get("if-modified-since") == index_last_modified
+        if not_modified:
+            return Response(status_code=304, headers=headers)
+        return Response(index_html_bytes, media_type="text/html", headers=headers)
 
     @app.get("/")
-    async def serve_frontend():
+    async def serve_frontend(request: Request):
         """Serve the React frontend"""
-        index_file = static_dir / "index.html"
-        if index_file.exists():
-            return FileResponse(index_file)
+        if index_html_bytes is not None:
+            return _index_response(request)
         return {"message": "Frontend not found. Build the frontend first."}
 
-    @app.get("/{full_path:path}")
-    async def serve_spa(full_path: str):
+    @app.get("/{full_path:spa_path}")
+    async def serve_spa(full_path: str, request: Request):
         """Serve SPA - return index.html for all non-API routes"""
-        if full_path.startswith("api/") or full_path.startswith("docs") or full_path.startswith("openapi.json"):
-            raise HTTPException(status_code=404, detail="Not found")
-
         file_path = static_dir / full_path
         if file_path.is_file():
             return FileResponse(file_path)
 
-        index_file = static_dir / "index.html"
-        if index_file.exists():
-            return FileResponse(index_file)
+        if index_html_bytes is not None:
+            return _index_response(request)
         raise HTTPException(status_code=404, detail="Not found")
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=settings.port)
+    # Multiple workers need an import string so each process can load the app
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=settings.port,
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        loop="uvloop",
+        http="httptools",
+        backlog=2048,
+        timeout_keep_alive=75,
+    )
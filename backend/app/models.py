@@ -1,26 +1,42 @@
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, ConfigDict, Field, EmailStr, SecretStr
 from typing import Optional, List
 from datetime import datetime
 
 
+class APIModel(BaseModel):
+    """
+    Base for request/response models.
+
+    Validation runs entirely in pydantic-core; keep it that way by not adding
+    per-assignment validation, whitespace stripping or ORM attribute lookup.
+    Unknown fields (e.g. extra Firestore keys) are dropped.
+    """
+    model_config = ConfigDict(
+        extra="ignore",
+        validate_assignment=False,
+        str_strip_whitespace=False,
+        from_attributes=False,
+    )
+
+
 # =============================================================================
 # AUTHENTICATION
 # =============================================================================
 
-class RegisterRequest(BaseModel):
+class RegisterRequest(APIModel):
     """Register a new user account."""
     email: EmailStr = Field(..., description="User email address")
     name: str = Field(..., min_length=1, max_length=100, description="User display name")
-    password: str = Field(..., min_length=8, description="Password (min 8 characters)")
+    password: SecretStr = Field(..., min_length=8, description="Password (min 8 characters)")
 
 
-class LoginRequest(BaseModel):
+class LoginRequest(APIModel):
     """Login with email and password."""
     email: EmailStr = Field(..., description="User email address")
-    password: str = Field(..., description="Password")
+    password: SecretStr = Field(..., description="Password")
 
 
-class AuthResponse(BaseModel):
+class AuthResponse(APIModel):
     """Response after successful login/register."""
     user_id: str = Field(..., description="User ID")
     token: str = Field(..., description="Authentication token")
@@ -28,7 +44,7 @@ class AuthResponse(BaseModel):
     email: str = Field(..., description="User email")
 
 
-class AnonymousUserResponse(BaseModel):
+class AnonymousUserResponse(APIModel):
     """Response for anonymous user creation."""
     user_id: str = Field(..., description="Anonymous user ID")
     is_anonymous: bool = Field(default=True, description="Flag indicating anonymous user")
@@ -38,7 +54,7 @@ class AnonymousUserResponse(BaseModel):
 # CHAT / MESSAGING
 # =============================================================================
 
-class ChatRequest(BaseModel):
+class ChatRequest(APIModel):
     """
     Request for sending a message to the agent.
 
@@ -51,7 +67,7 @@ class ChatRequest(BaseModel):
     session_id: Optional[str] = Field(None, description="Optional session ID for specific conversation thread")
 
 
-class ChatResponse(BaseModel):
+class ChatResponse(APIModel):
     """Response from the agent."""
     response: str = Field(..., description="Agent response")
     user_id: str = Field(..., description="User identifier")
@@ -62,7 +78,7 @@ class ChatResponse(BaseModel):
 # SESSION MANAGEMENT
 # =============================================================================
 
-class SessionInfo(BaseModel):
+class SessionInfo(APIModel):
     """Information about a conversation session."""
     session_id: str
     session_name: str
@@ -72,18 +88,18 @@ class SessionInfo(BaseModel):
     is_active: bool
 
 
-class SessionListResponse(BaseModel):
+class SessionListResponse(APIModel):
     """List of user's sessions."""
     user_id: str
     sessions: List[SessionInfo]
 
 
-class RenameSessionRequest(BaseModel):
+class RenameSessionRequest(APIModel):
     """Request to rename a session."""
     session_name: str = Field(..., min_length=1, max_length=100, description="New session name")
 
 
-class MessageInfo(BaseModel):
+class MessageInfo(APIModel):
     """Information about a message in a conversation."""
     message_id: str
     session_id: str
@@ -92,7 +108,7 @@ class MessageInfo(BaseModel):
     timestamp: datetime
 
 
-class MessageHistoryResponse(BaseModel):
+class MessageHistoryResponse(APIModel):
     """Message history for a session."""
     session_id: str
     messages: List[MessageInfo]
@@ -102,7 +118,7 @@ class MessageHistoryResponse(BaseModel):
 # HEALTH CHECK
 # =============================================================================
 
-class HealthResponse(BaseModel):
+class HealthResponse(APIModel):
     status: str
     agent_engine: str
     project: str
@@ -0,0 +1,45 @@
+"""
+Shared Redis connection pool (optional).
+
+Redis is only used when REDIS_URL is configured. Every caller goes through
+get_redis(), which returns a single pooled client per process so requests
+reuse open connections instead of paying TCP/TLS setup on each call.
+
+When REDIS_URL is unset, get_redis() returns None and callers fall back to
+their Firestore-backed implementation.
+"""
+
+from .config import settings
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Upper bound on open connections per process (uvicorn worker)
+REDIS_MAX_CONNECTIONS = 64
+
+_redis = None
+
+
+def get_redis():
+    """Get or create the process-wide Redis client, or None if Redis is not configured."""
+    global _redis
+
+    if _redis is None and settings.redis_url:
+        from redis.asyncio import ConnectionPool, Redis
+
+        pool = ConnectionPool.from_url(
+            settings.redis_url, max_connections=REDIS_MAX_CONNECTIONS, decode_responses=True
+        )
+        _redis = Redis(connection_pool=pool)
+        logger.info("Redis connection pool created", max_connections=REDIS_MAX_CONNECTIONS)
+
+    return _redis
+
+
+async def close_redis() -> None:
+    """Close the Redis client and release pooled connections (called on shutdown)."""
+    global _redis
+
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
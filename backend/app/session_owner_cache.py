@@ -0,0 +1,48 @@
+"""
+Session ownership cache (optional, Redis-backed).
+
+Maps session_id -> owning user_id so the session endpoints can authorize a
+request with a single Redis GET instead of reading the session document.
+Ownership never changes after creation, so entries only need invalidating
+when a session is deleted.
+
+When REDIS_URL is unset every call is a no-op / miss and callers fall back to
+Database.get_session (itself cached per process).
+"""
+
+from typing import Optional
+
+from .redis_client import get_redis
+
+SESSION_OWNER_TTL_SECONDS = 3600
+
+
+def _owner_key(session_id: str) -> str:
+    return f"session:{session_id}:owner"
+
+
+async def get_owner(session_id: str) -> Optional[str]:
+    """Return the cached owner user_id, or None on a miss."""
+    redis = get_redis()
+    if redis is None:
+        return None
+
+    return await redis.get(_owner_key(session_id))
+
+
+async def set_owner(session_id: str, user_id: str) -> None:
+    """Cache the owner of a session."""
+    redis = get_redis()
+    if redis is None:
+        return
+
+    await redis.set(_owner_key(session_id), user_id, ex=SESSION_OWNER_TTL_SECONDS)
+
+
+async def invalidate(session_id: str) -> None:
+    """Drop a cached owner (on delete)."""
+    redis = get_redis()
+    if redis is None:
+        return
+
+    await redis.delete(_owner_key(session_id))
@@ -0,0 +1,99 @@
+"""
+Static file serving for the built frontend's /assets.
+
+Vite emits content-hashed filenames under assets/, so a given URL never
+changes content and can be cached by browsers indefinitely. The Docker build
+also writes .br / .gz siblings for JS/CSS/SVG; these are served with
+Content-Encoding when the client accepts them, so nothing is compressed at
+request time.
+"""
+
+import functools
+import os
+from pathlib import Path
+from typing import Dict
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Preferred first
+_PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+@functools.lru_cache(maxsize=256)
+def _accept_encoding_qvalues(accept_encoding: str) -> Dict[str, float]:
+    """
+    Map each coding in an Accept-Encoding header to its q-value.
+
+    Cached per header value: browsers send the same few strings on every
+    request. The returned dict is shared, so callers must not modify it.
+    """
+    qvalues = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        qvalue = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    qvalue = float(value)
+                except ValueError:
+                    qvalue = 0.0
+        qvalues[coding] = qvalue
+    return qvalues
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """
+    StaticFiles for content-hashed assets: long-lived immutable caching plus
+    precompressed .br/.gz variants.
+
+    The precompressed files are indexed once at startup (the assets are baked
+    into the image), so choosing a variant costs no extra stat() per request.
+    Keys are resolved the same way lookup_path resolves request paths (real
+    paths unless follow_symlink), so a symlinked directory still matches.
+    """
+
+    def __init__(self, *, directory, **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        resolve = os.path.abspath if self.follow_symlink else os.path.realpath
+        self._precompressed = {
+            resolve(path): path.stat()
+            for path in Path(directory).rglob("*")
+            if path.suffix in (".br", ".gz") and path.is_file()
+        }
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        qvalues = _accept_encoding_qvalues(Headers(scope=scope).get("accept-encoding", ""))
+
+        # Highest q-value wins, ties go to the preferred encoding; q=0 means "not acceptable"
+        chosen = None
+        for encoding, suffix in _PRECOMPRESSED_ENCODINGS:
+            variant = f"{full_path}{suffix}"
+            qvalue = qvalues.get(encoding, qvalues.get("*", 0.0))
+            if qvalue > 0 and variant in self._precompressed and (chosen is None or qvalue > chosen[0]):
+                chosen = (qvalue, encoding, variant)
+
+        if chosen is not None:
+            _, encoding, variant = chosen
+            response = super().file_response(variant, self._precompressed[variant], scope, status_code)
+            response.headers["Content-Encoding"] = encoding
+        else:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
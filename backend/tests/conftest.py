@@ -0,0 +1,20 @@
+"""
+Pytest configuration for backend unit tests.
+
+These tests run WITHOUT Firestore, Redis or Agent Engine: settings are
+filled with placeholders before the app package is imported, and tests
+that need a database swap in a fake.
+
+Run with (from backend/):
+    pytest tests -v
+"""
+
+import os
+import sys
+
+# Settings() is instantiated at import time and requires these
+os.environ.setdefault("GOOGLE_CLOUD_PROJECT", "test-project")
+os.environ.setdefault("AGENT_ENGINE_RESOURCE_NAME", "projects/test-project/locations/us-central1/reasoningEngines/0")
+os.environ.pop("REDIS_URL", None)
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
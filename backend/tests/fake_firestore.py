@@ -0,0 +1,193 @@
+"""
+In-Memory Firestore Fake for Backend Tests
+==========================================
+Implements the subset of the google-cloud-firestore client API used by
+app.database: documents and subcollections, where / order_by / limit /
+select queries, write batches, SERVER_TIMESTAMP and Increment.
+
+SERVER_TIMESTAMP resolves to a fake clock that advances by one second per
+write, so every write produces a distinct, increasing updated_at.
+"""
+
+import operator
+from datetime import datetime, timedelta, timezone
+
+from google.api_core import exceptions as gcp_exceptions
+from google.cloud import firestore
+from google.cloud.firestore_v1.transforms import Increment
+
+_OPERATORS = {
+    "==": operator.eq,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+class FakeSnapshot:
+    """Mimics a Firestore DocumentSnapshot."""
+
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeDocument:
+    """Mimics a Firestore DocumentReference."""
+
+    def __init__(self, client, path):
+        self._client = client
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    def get(self, field_paths=None):
+        data = self._client._documents.get(self.path)
+        if data is not None and field_paths is not None:
+            data = {key: value for key, value in data.items() if key in field_paths}
+        return FakeSnapshot(self, data)
+
+    def set(self, data):
+        self._client._documents[self.path] = self._client._resolve(data, {})
+
+    def create(self, data):
+        if self.path in self._client._documents:
+            raise gcp_exceptions.AlreadyExists(f"Document already exists: {self.path}")
+        self.set(data)
+
+    def update(self, data):
+        current = self._client._documents.get(self.path)
+        if current is None:
+            raise gcp_exceptions.NotFound(f"No document to update: {self.path}")
+        current.update(self._client._resolve(data, current))
+
+    def collection(self, name):
+        return FakeCollection(self._client, f"{self.path}/{name}")
+
+
+class FakeQuery:
+    """Mimics a Firestore Query: filters, ordering and limit are applied on stream()."""
+
+    def __init__(self, client, path, filters=(), orders=(), limit_count=None, fields=None):
+        self._client = client
+        self._path = path
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._limit = limit_count
+        self._fields = fields
+
+    def _copy(self, **changes):
+        state = {
+            "filters": self._filters,
+            "orders": self._orders,
+            "limit_count": self._limit,
+            "fields": self._fields,
+        }
+        state.update(changes)
+        return FakeQuery(self._client, self._path, **state)
+
+    def where(self, field, op, value):
+        return self._copy(filters=self._filters + ((field, _OPERATORS[op], value),))
+
+    def order_by(self, field, direction=firestore.Query.ASCENDING):
+        return self._copy(orders=self._orders + ((field, direction == firestore.Query.DESCENDING),))
+
+    def limit(self, count):
+        return self._copy(limit_count=count)
+
+    def select(self, fields):
+        return self._copy(fields=list(fields))
+
+    def stream(self):
+        prefix = self._path + "/"
+        matches = []
+        for path, data in self._client._documents.items():
+            if not path.startswith(prefix) or "/" in path[len(prefix) :]:
+                continue
+            # Like Firestore, documents missing a filtered or ordered field never match
+            if any(field not in data or not op(data[field], value) for field, op, value in self._filters):
+                continue
+            if any(field not in data for field, _ in self._orders):
+                continue
+            matches.append((path, data))
+
+        for field, descending in reversed(self._orders):
+            matches.sort(key=lambda item: item[1][field], reverse=descending)
+        if self._limit is not None:
+            matches = matches[: self._limit]
+
+        for path, data in matches:
+            if self._fields is not None:
+                data = {key: value for key, value in data.items() if key in self._fields}
+            yield FakeSnapshot(FakeDocument(self._client, path), data)
+
+
+class FakeCollection(FakeQuery):
+    """Mimics a Firestore CollectionReference."""
+
+    def __init__(self, client, path):
+        super().__init__(client, path)
+
+    def document(self, doc_id):
+        return FakeDocument(self._client, f"{self._path}/{doc_id}")
+
+
+class FakeWriteBatch:
+    """Mimics a Firestore WriteBatch: writes are applied together on commit()."""
+
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def set(self, reference, data):
+        self._writes.append((reference.set, data))
+
+    def create(self, reference, data):
+        self._writes.append((reference.create, data))
+
+    def update(self, reference, data):
+        self._writes.append((reference.update, data))
+
+    def commit(self):
+        snapshot = {path: dict(data) for path, data in self._client._documents.items()}
+        try:
+            for write, data in self._writes:
+                write(data)
+        except Exception:
+            # All-or-nothing, like a real batch
+            self._client._documents = snapshot
+            raise
+
+
+class FakeFirestoreClient:
+    """In-memory Firestore client; documents are stored by full path."""
+
+    def __init__(self):
+        self._documents = {}
+        self._clock = datetime(2026, 1, 15, tzinfo=timezone.utc)
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+    def batch(self):
+        return FakeWriteBatch(self)
+
+    def _server_timestamp(self):
+        self._clock += timedelta(seconds=1)
+        return self._clock
+
+    def _resolve(self, data, current):
+        """Replace SERVER_TIMESTAMP / Increment sentinels with concrete values."""
+        resolved = {}
+        for key, value in data.items():
+            if value is firestore.SERVER_TIMESTAMP:
+                value = self._server_timestamp()
+            elif isinstance(value, Increment):
+                value = current.get(key, 0) + value.value
+            resolved[key] = value
+        return resolved
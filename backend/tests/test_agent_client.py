@@ -0,0 +1,72 @@
+"""
+Unit tests for the pooled Agent Engine execution channels (app.agent_client).
+
+Channels are created but never connected: credentials are anonymous and
+grpc.secure_channel / grpc.aio.secure_channel are wrapped to record options.
+
+Run with:
+    pytest tests/test_agent_client.py -v
+"""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import grpc
+import grpc.aio
+import pytest
+import vertexai
+from google.auth.credentials import AnonymousCredentials
+
+from app import agent_client
+
+
+@pytest.fixture
+def channel_options():
+    """Record (kind, options) for every gRPC channel opened while the fixture is active."""
+    vertexai.init(
+        project="test-project", location="us-central1", credentials=AnonymousCredentials(), api_transport="grpc"
+    )
+    opened = []
+    secure_channel, aio_secure_channel = grpc.secure_channel, grpc.aio.secure_channel
+
+    def record(kind, open_channel):
+        def wrapper(target, credentials, options=None, **kwargs):
+            opened.append((kind, dict(options or ())))
+            return open_channel(target, credentials, options=options, **kwargs)
+
+        return wrapper
+
+    with (
+        patch("grpc.secure_channel", record("sync", secure_channel)),
+        patch("grpc.aio.secure_channel", record("aio", aio_secure_channel)),
+    ):
+        yield opened
+
+
+class TestPooledChannels:
+    async def test_execution_clients_hold_one_keepalive_channel_each(self, channel_options):
+        remote_app = SimpleNamespace()
+
+        agent_client._use_pooled_channels(remote_app)
+
+        for attr in agent_client._EXECUTION_CLIENT_ATTRS:
+            assert getattr(remote_app, attr)._is_temporary is False
+        assert [kind for kind, _ in channel_options] == ["sync", "aio"]
+        for _, options in channel_options:
+            for name, value in agent_client._KEEPALIVE_CHANNEL_OPTIONS:
+                assert options[name] == value
+            # The transport's own options are kept
+            assert options["grpc.max_receive_message_length"] == -1
+
+        client = agent_client.AgentEngineClient.__new__(agent_client.AgentEngineClient)
+        client._remote_app = remote_app
+        await client.close()
+
+    def test_sdk_layout_change_keeps_stock_clients(self, channel_options):
+        remote_app = SimpleNamespace(execution_api_client="stock", execution_async_client="stock")
+
+        with patch("google.cloud.aiplatform.utils.AgentEngineExecutionAsyncClientWithOverride", object):
+            agent_client._use_pooled_channels(remote_app)
+
+        assert remote_app.execution_api_client == "stock"
+        assert remote_app.execution_async_client == "stock"
@@ -0,0 +1,48 @@
+"""
+Unit tests for password hashing (app.auth).
+
+Run with:
+    pytest tests/test_auth.py -v
+"""
+
+import bcrypt
+
+from app import auth
+
+PASSWORD = "correct horse battery staple".encode("utf-8")
+
+
+class TestPasswordHashing:
+    """Argon2id hashing with legacy bcrypt verification."""
+
+    def test_argon2_round_trip(self):
+        password_hash = auth.hash_password(PASSWORD)
+
+        assert password_hash.startswith("$argon2id$")
+        assert auth.verify_password(PASSWORD, password_hash)
+        assert not auth.needs_rehash(password_hash)
+
+    def test_legacy_bcrypt_hash_verifies_and_needs_rehash(self):
+        legacy_hash = bcrypt.hashpw(PASSWORD, bcrypt.gensalt(rounds=4)).decode("ascii")
+
+        assert auth.verify_password(PASSWORD, legacy_hash)
+        assert auth.needs_rehash(legacy_hash)
+
+    def test_wrong_password_is_rejected(self):
+        argon2_hash = auth.hash_password(PASSWORD)
+        legacy_hash = bcrypt.hashpw(PASSWORD, bcrypt.gensalt(rounds=4)).decode("ascii")
+
+        assert not auth.verify_password(b"wrong password", argon2_hash)
+        assert not auth.verify_password(b"wrong password", legacy_hash)
+
+    def test_malformed_hash_is_rejected(self):
+        assert not auth.verify_password(PASSWORD, "not-a-hash")
+        assert auth.needs_rehash("not-a-hash")
+
+
+class TestTokenGeneration:
+    def test_tokens_are_url_safe_and_unique(self):
+        tokens = {auth.generate_token() for _ in range(100)}
+
+        assert len(tokens) == 100
+        assert all(len(token) == 43 and token.replace("-", "").replace("_", "").isalnum() for token in tokens)
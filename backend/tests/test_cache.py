@@ -0,0 +1,148 @@
+"""
+Unit tests for the in-process TTL + LRU cache (app.cache).
+
+time.monotonic is patched to a fake clock, so expiry is exact.
+
+Run with:
+    pytest tests/test_cache.py -v
+"""
+
+import pytest
+
+from app import cache as cache_module
+from app.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+class TestTTLExpiry:
+    """Entries expire ttl_seconds after they were set."""
+
+    def test_entry_is_live_until_ttl(self, clock):
+        cache = TTLCache(maxsize=10, ttl_seconds=30)
+        cache.set("a", 1)
+
+        clock.advance(29.9)
+        assert cache.get("a") == 1
+
+    def test_entry_expires_at_ttl(self, clock):
+        cache = TTLCache(maxsize=10, ttl_seconds=30)
+        cache.set("a", 1)
+
+        clock.advance(30)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_get_does_not_extend_expiry(self, clock):
+        cache = TTLCache(maxsize=10, ttl_seconds=30)
+        cache.set("a", 1)
+
+        clock.advance(20)
+        assert cache.get("a") == 1
+        clock.advance(10)
+        assert cache.get("a") is None
+
+    def test_set_restarts_expiry(self, clock):
+        cache = TTLCache(maxsize=10, ttl_seconds=30)
+        cache.set("a", 1)
+
+        clock.advance(20)
+        cache.set("a", 2)
+        clock.advance(20)
+        assert cache.get("a") == 2
+
+
+class TestLRUEviction:
+    """When full, the least recently used entry is evicted first."""
+
+    def test_oldest_entry_is_evicted(self, clock):
+        cache = TTLCache(maxsize=2, ttl_seconds=30)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.get("c") == 3
+
+    def test_get_marks_entry_as_recently_used(self, clock):
+        cache = TTLCache(maxsize=2, ttl_seconds=30)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_replacing_an_entry_does_not_evict(self, clock):
+        cache = TTLCache(maxsize=2, ttl_seconds=30)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("a", 10)
+        cache.set("c", 3)
+
+        assert len(cache) == 2
+        assert cache.get("a") == 10
+        assert cache.get("b") is None
+
+
+class TestUpdate:
+    """update() rewrites a live entry in place and never inserts."""
+
+    def test_update_applies_func_and_keeps_expiry(self, clock):
+        cache = TTLCache(maxsize=10, ttl_seconds=30)
+        cache.set("a", [1])
+
+        clock.advance(20)
+        cache.update("a", lambda value: value + [2])
+        assert cache.get("a") == [1, 2]
+
+        clock.advance(10)
+        assert cache.get("a") is None
+
+    def test_update_on_missing_key_is_a_no_op(self, clock):
+        cache = TTLCache(maxsize=10, ttl_seconds=30)
+        calls = []
+
+        cache.update("missing", lambda value: calls.append(value) or value)
+
+        assert calls == []
+        assert cache.get("missing") is None
+        assert len(cache) == 0
+
+    def test_update_on_expired_key_drops_it(self, clock):
+        cache = TTLCache(maxsize=10, ttl_seconds=30)
+        cache.set("a", 1)
+        calls = []
+
+        clock.advance(30)
+        cache.update("a", lambda value: calls.append(value) or value)
+
+        assert calls == []
+        assert len(cache) == 0
+
+    def test_pop_invalidates_entry(self, clock):
+        cache = TTLCache(maxsize=10, ttl_seconds=30)
+        cache.set("a", 1)
+
+        cache.pop("a")
+        cache.pop("a")
+        assert cache.get("a") is None
@@ -0,0 +1,92 @@
+"""
+Unit tests for the Firestore data layer (app.database).
+
+Firestore is replaced by a MagicMock client, so these tests check which
+writes are batched and how retries behave, not Firestore itself.
+
+Run with:
+    pytest tests/test_database.py -v
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from google.api_core import exceptions as gcp_exceptions
+
+from app.database import Database
+
+
+@pytest.fixture
+def database():
+    """Database backed by a MagicMock Firestore client; retry back-off is skipped."""
+    with patch("app.database.firestore.Client"), patch("app.database.time.sleep"):
+        yield Database(project_id="test-project", database_id="(default)")
+
+
+def _batches(database, *commit_effects):
+    """Make db.batch() return a fresh mock batch per attempt, committing with the given side effects."""
+    batches = []
+    for effect in commit_effects:
+        batch = MagicMock()
+        batch.commit.side_effect = effect
+        batches.append(batch)
+    database.db.batch.side_effect = batches
+    return batches
+
+
+def _written_ids(batch):
+    """(session_id, message_id) of every document written by a mock batch, in call order."""
+    return [
+        (call.args[1].get("session_id"), call.args[1].get("message_id"))
+        for call in batch.set.call_args_list + batch.create.call_args_list
+    ]
+
+
+class TestCreateSessionWithMessages:
+    """The first exchange is written with the session in one batch."""
+
+    def test_retry_rewrites_the_same_documents(self, database):
+        first, second = _batches(database, gcp_exceptions.ServiceUnavailable("unavailable"), None)
+
+        session_id = database.create_session_with_messages("user-1", "engine-1", "Hi", "Hello!")
+
+        assert len(_written_ids(first)) == 3
+        assert _written_ids(first) == _written_ids(second)
+        session_data = first.set.call_args_list[0].args[1]
+        assert session_data["session_id"] == session_id
+        assert session_data["message_count"] == 2
+
+    def test_transcript_is_cached(self, database):
+        _batches(database, None)
+
+        session_id = database.create_session_with_messages("user-1", "engine-1", "Hi", "Hello!")
+
+        messages = database.get_session_messages(session_id, message_count=2)
+        assert [(m["role"], m["content"]) for m in messages] == [("user", "Hi"), ("assistant", "Hello!")]
+
+
+class TestCommitChatWrites:
+    """A chat exchange is applied to the session at most once, even when retried."""
+
+    def test_retry_reuses_message_ids(self, database):
+        first, second = _batches(database, gcp_exceptions.DeadlineExceeded("deadline"), None)
+
+        message_ids = database.commit_chat_writes("session-1", "Where is my order?", "It shipped.")
+
+        assert [message_id for _, message_id in _written_ids(first)] == message_ids
+        assert _written_ids(first) == _written_ids(second)
+        first.create.assert_called()
+        first.set.assert_not_called()
+
+    def test_lost_commit_response_does_not_increment_twice(self, database):
+        """The first commit landed but reported an error; the retry hits AlreadyExists and stops."""
+        _batches(
+            database,
+            gcp_exceptions.DeadlineExceeded("deadline"),
+            gcp_exceptions.AlreadyExists("message exists"),
+        )
+
+        message_ids = database.commit_chat_writes("session-1", "Where is my order?", "It shipped.")
+
+        assert len(message_ids) == 2
+        assert database.db.batch.call_count == 2
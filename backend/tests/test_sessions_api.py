@@ -0,0 +1,254 @@
+"""
+API tests for the session endpoints: ETag / If-None-Match and message paging.
+
+The app runs against the real Database class backed by an in-memory
+Firestore fake, so the version reads, transcript cache and keyset queries
+behave as they do in production. The agent is never called.
+
+Run with:
+    pytest tests/test_sessions_api.py -v
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fake_firestore import FakeFirestoreClient
+from fastapi.testclient import TestClient
+from google.cloud import firestore
+
+USER_ID = "anon-test-user"
+OTHER_USER_ID = "anon-other-user"
+
+
+@pytest.fixture(scope="module")
+def main_module():
+    """Import app.main without connecting to Firestore."""
+    with patch("google.cloud.firestore.Client"):
+        from app import main
+    return main
+
+
+@pytest.fixture
+def database(main_module, monkeypatch):
+    """A fresh Database over an empty in-memory Firestore, installed in app.main."""
+    from app.database import Database
+
+    with patch("google.cloud.firestore.Client", return_value=FakeFirestoreClient()):
+        database = Database(project_id="test-project", database_id="(default)")
+    monkeypatch.setattr(main_module, "db", database)
+    return database
+
+
+@pytest.fixture
+def client(main_module, database, monkeypatch):
+    """TestClient for the app with the agent stubbed out and rate limits reset."""
+    from app.rate_limiter import rate_limiter
+
+    rate_limiter.reset()
+    monkeypatch.setattr(main_module.agent_client, "query_agent", AsyncMock(return_value=("Agent reply", "engine-1")))
+    monkeypatch.setattr(main_module.agent_client, "create_session", AsyncMock(return_value="engine-1"))
+    return TestClient(main_module.app, headers={"X-User-Id": USER_ID})
+
+
+def _create_session(database, user_message="Hi", assistant_message="Hello!"):
+    return database.create_session_with_messages(USER_ID, "engine-1", user_message, assistant_message)
+
+
+def _append_messages(database, session_id, count):
+    """Write count messages directly to Firestore (as another instance would), one second apart."""
+    start = datetime.now(timezone.utc) + timedelta(minutes=1)
+    messages_ref = database.db.collection("sessions").document(session_id).collection("messages")
+    for index in range(count):
+        message_id = f"msg-{index:03d}"
+        messages_ref.document(message_id).set(
+            {
+                "message_id": message_id,
+                "session_id": session_id,
+                "role": "user" if index % 2 == 0 else "assistant",
+                "content": f"message {index}",
+                "timestamp": start + timedelta(seconds=index),
+            }
+        )
+    database.db.collection("sessions").document(session_id).update(
+        {"message_count": firestore.Increment(count), "updated_at": firestore.SERVER_TIMESTAMP}
+    )
+
+
+# =============================================================================
+# SESSION LIST
+# =============================================================================
+
+
+class TestListSessionsETag:
+    """GET /api/sessions returns 304 until one of the user's sessions changes."""
+
+    def test_matching_etag_returns_304_without_listing(self, client, database):
+        _create_session(database)
+        first = client.get("/api/sessions")
+        etag = first.headers["etag"]
+
+        with patch.object(database, "get_user_sessions", wraps=database.get_user_sessions) as get_user_sessions:
+            repeat = client.get("/api/sessions", headers={"If-None-Match": etag})
+
+        assert first.status_code == 200
+        assert len(first.json()["sessions"]) == 1
+        assert repeat.status_code == 304
+        assert repeat.content == b""
+        assert repeat.headers["etag"] == etag
+        get_user_sessions.assert_not_called()
+
+    def test_etag_changes_after_rename(self, client, database):
+        session_id = _create_session(database)
+        etag = client.get("/api/sessions").headers["etag"]
+
+        assert client.put(f"/api/sessions/{session_id}/rename", json={"session_name": "Returns"}).status_code == 200
+        response = client.get("/api/sessions", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()["sessions"][0]["session_name"] == "Returns"
+
+    def test_etag_changes_after_delete(self, client, database):
+        session_id = _create_session(database)
+        etag = client.get("/api/sessions").headers["etag"]
+
+        assert client.delete(f"/api/sessions/{session_id}").status_code == 200
+        response = client.get("/api/sessions", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()["sessions"] == []
+
+    def test_etag_changes_after_chat(self, client, database):
+        session_id = _create_session(database)
+        etag = client.get("/api/sessions").headers["etag"]
+
+        chat = client.post("/api/chat", json={"message": "Where is my order?", "session_id": session_id})
+        assert chat.status_code == 200
+        response = client.get("/api/sessions", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()["sessions"][0]["message_count"] == 4
+
+    def test_etags_are_per_user(self, client, database):
+        _create_session(database)
+        etag = client.get("/api/sessions").headers["etag"]
+
+        response = client.get("/api/sessions", headers={"If-None-Match": etag, "X-User-Id": OTHER_USER_ID})
+
+        assert response.status_code == 200
+        assert response.json()["sessions"] == []
+
+
+# =============================================================================
+# MESSAGE HISTORY
+# =============================================================================
+
+
+class TestSessionMessagesETag:
+    """GET /api/sessions/{id}/messages returns 304 until the session changes."""
+
+    def test_matching_etag_returns_304_without_reading_messages(self, client, database):
+        session_id = _create_session(database)
+        first = client.get(f"/api/sessions/{session_id}/messages")
+        etag = first.headers["etag"]
+
+        with patch.object(database, "get_session_messages", wraps=database.get_session_messages) as get_messages:
+            repeat = client.get(f"/api/sessions/{session_id}/messages", headers={"If-None-Match": etag})
+
+        assert [m["content"] for m in first.json()["messages"]] == ["Hi", "Hello!"]
+        assert repeat.status_code == 304
+        assert repeat.content == b""
+        get_messages.assert_not_called()
+
+    def test_etag_changes_after_chat(self, client, database):
+        session_id = _create_session(database)
+        etag = client.get(f"/api/sessions/{session_id}/messages").headers["etag"]
+
+        client.post("/api/chat", json={"message": "Where is my order?", "session_id": session_id})
+        response = client.get(f"/api/sessions/{session_id}/messages", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert [m["content"] for m in response.json()["messages"]][-2:] == ["Where is my order?", "Agent reply"]
+
+    def test_etag_changes_after_rename(self, client, database):
+        session_id = _create_session(database)
+        etag = client.get(f"/api/sessions/{session_id}/messages").headers["etag"]
+
+        client.put(f"/api/sessions/{session_id}/rename", json={"session_name": "Returns"})
+        response = client.get(f"/api/sessions/{session_id}/messages", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    def test_write_from_another_instance_is_not_served_from_cache(self, client, database):
+        """A cached transcript older than the session's message_count is bypassed."""
+        session_id = _create_session(database)
+        client.get(f"/api/sessions/{session_id}/messages")
+
+        _append_messages(database, session_id, 2)
+        response = client.get(f"/api/sessions/{session_id}/messages")
+
+        assert [m["content"] for m in response.json()["messages"]] == ["Hi", "Hello!", "message 0", "message 1"]
+
+    def test_other_users_session_is_forbidden(self, client, database):
+        session_id = _create_session(database)
+
+        response = client.get(f"/api/sessions/{session_id}/messages", headers={"X-User-Id": OTHER_USER_ID})
+
+        assert response.status_code == 403
+
+
+class TestSessionMessagesPaging:
+    """limit / before page backwards through a transcript, newest page first."""
+
+    def test_limit_returns_newest_page_in_order(self, client, database):
+        session_id = database.create_session(USER_ID, "engine-1")
+        _append_messages(database, session_id, 7)
+
+        response = client.get(f"/api/sessions/{session_id}/messages", params={"limit": 3})
+
+        assert [m["content"] for m in response.json()["messages"]] == ["message 4", "message 5", "message 6"]
+
+    def test_before_pages_back_to_the_first_message(self, client, database):
+        session_id = database.create_session(USER_ID, "engine-1")
+        _append_messages(database, session_id, 7)
+
+        pages = []
+        params = {"limit": 3}
+        while True:
+            messages = client.get(f"/api/sessions/{session_id}/messages", params=params).json()["messages"]
+            if not messages:
+                break
+            pages.append([m["content"] for m in messages])
+            params = {"limit": 3, "before": messages[0]["timestamp"]}
+
+        assert pages == [
+            ["message 4", "message 5", "message 6"],
+            ["message 1", "message 2", "message 3"],
+            ["message 0"],
+        ]
+
+    def test_pages_have_distinct_etags(self, client, database):
+        session_id = database.create_session(USER_ID, "engine-1")
+        _append_messages(database, session_id, 7)
+
+        newest = client.get(f"/api/sessions/{session_id}/messages", params={"limit": 3})
+        before = newest.json()["messages"][0]["timestamp"]
+        older = client.get(
+            f"/api/sessions/{session_id}/messages",
+            params={"limit": 3, "before": before},
+            headers={"If-None-Match": newest.headers["etag"]},
+        )
+
+        assert older.status_code == 200
+        assert older.headers["etag"] != newest.headers["etag"]
+
+    def test_limit_is_validated(self, client, database):
+        session_id = _create_session(database)
+
+        assert client.get(f"/api/sessions/{session_id}/messages", params={"limit": 0}).status_code == 422
+        assert client.get(f"/api/sessions/{session_id}/messages", params={"limit": 201}).status_code == 422
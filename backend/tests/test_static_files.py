@@ -0,0 +1,105 @@
+"""
+Unit tests for precompressed asset serving (app.static_files).
+
+Run with:
+    pytest tests/test_static_files.py -v
+"""
+
+import gzip
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.static_files import IMMUTABLE_CACHE_CONTROL, ImmutableStaticFiles
+
+SCRIPT = b"console.log('hello');\n" * 20
+# Stand-in bytes: responses are read raw, so the body is never decoded
+BROTLI_SCRIPT = b"brotli-compressed app.js"
+
+
+@pytest.fixture
+def assets_dir(tmp_path):
+    """assets/ with app.js (+ .br and .gz variants) and style.css (no variants), reached through a symlink."""
+    real_dir = tmp_path / "static" / "assets"
+    real_dir.mkdir(parents=True)
+    (real_dir / "app.js").write_bytes(SCRIPT)
+    (real_dir / "app.js.br").write_bytes(BROTLI_SCRIPT)
+    (real_dir / "app.js.gz").write_bytes(gzip.compress(SCRIPT))
+    (real_dir / "style.css").write_bytes(b"body { margin: 0; }\n")
+
+    # The directory handed to StaticFiles is a symlink; lookup_path resolves it to the real path
+    link = tmp_path / "current"
+    os.symlink(tmp_path / "static", link)
+    return link / "assets"
+
+
+@pytest.fixture
+def client(assets_dir):
+    app = FastAPI()
+    app.mount("/assets", ImmutableStaticFiles(directory=assets_dir), name="assets")
+    return TestClient(app)
+
+
+def _get_raw(client, path, accept_encoding):
+    """GET without decoding the body. Returns (response, raw body bytes)."""
+    with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+class TestPrecompressedAssets:
+    def test_brotli_preferred_when_accepted(self, client):
+        response, body = _get_raw(client, "/assets/app.js", "gzip, deflate, br")
+
+        assert response.headers["content-encoding"] == "br"
+        assert response.headers["content-type"].startswith("text/javascript")
+        assert body == BROTLI_SCRIPT
+
+    def test_gzip_when_brotli_not_accepted(self, client):
+        response, body = _get_raw(client, "/assets/app.js", "gzip")
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert gzip.decompress(body) == SCRIPT
+
+    def test_identity_when_no_encoding_accepted(self, client):
+        response, body = _get_raw(client, "/assets/app.js", "identity")
+
+        assert "content-encoding" not in response.headers
+        assert body == SCRIPT
+
+    def test_zero_qvalue_rejects_an_encoding(self, client):
+        response, _ = _get_raw(client, "/assets/app.js", "br;q=0, gzip")
+        assert response.headers["content-encoding"] == "gzip"
+
+        response, body = _get_raw(client, "/assets/app.js", "br;q=0, gzip;q=0")
+        assert "content-encoding" not in response.headers
+        assert body == SCRIPT
+
+    def test_highest_qvalue_wins(self, client):
+        response, _ = _get_raw(client, "/assets/app.js", "br;q=0.5, gzip;q=0.8")
+
+        assert response.headers["content-encoding"] == "gzip"
+
+    def test_wildcard_accepts_unlisted_encodings(self, client):
+        response, _ = _get_raw(client, "/assets/app.js", "*")
+
+        assert response.headers["content-encoding"] == "br"
+
+    def test_substring_is_not_an_accepted_encoding(self, client):
+        response, _ = _get_raw(client, "/assets/app.js", "x-brotli-nope")
+
+        assert "content-encoding" not in response.headers
+
+    def test_asset_without_variants_is_served_as_is(self, client):
+        response, body = _get_raw(client, "/assets/style.css", "br, gzip")
+
+        assert "content-encoding" not in response.headers
+        assert body == b"body { margin: 0; }\n"
+
+    @pytest.mark.parametrize("accept_encoding", ["br", "gzip", "identity"])
+    def test_cache_headers_on_every_variant(self, client, accept_encoding):
+        response, _ = _get_raw(client, "/assets/app.js", accept_encoding)
+
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
@@ -1,4 +1,16 @@
-from customer_support_agent import agent  # For adk eval CLI compatibility
-from customer_support_agent.main import root_agent
+import importlib
 
 __all__ = ["root_agent", "agent"]
+
+
+def __getattr__(name):
+    # Loaded on first access so importing a submodule (tools, database.seed)
+    # doesn't build the whole agent graph
+    if name == "root_agent":
+        from customer_support_agent.main import root_agent
+
+        return root_agent
+    if name == "agent":
+        # For adk eval CLI compatibility
+        return importlib.import_module("customer_support_agent.agent")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -9,6 +9,7 @@ from google.adk.tools import preload_memory_tool
 
 from customer_support_agent.agents.callbacks import (
     auto_save_to_memory,
+    compact_product_tool_result,
     log_system_instructions,
 )
 
@@ -150,6 +151,7 @@ WRONG:
         get_product_reviews,
         # AgentTool(multi_product_details_loop)  # DISABLED: Too slow, causes timeouts
     ],
+    after_tool_callback=compact_product_tool_result,  # Keeps tool results small in the session context
     before_model_callback=log_system_instructions,  # DEBUG: Log system instruction with preloaded memories
     after_agent_callback=auto_save_to_memory,  # IMPLICIT (invocation context) ✅ Active
 )
@@ -5,17 +5,17 @@ This module contains the root agent that routes queries to specialist agents.
 """
 
 from google.adk.agents import Agent
-from google.adk.tools import AgentTool, preload_memory_tool
+from google.adk.tools import preload_memory_tool
 
 from customer_support_agent.agents.billing_agent import billing_agent
 
 # Import callbacks
-from customer_support_agent.agents.callbacks import auto_save_to_memory
+from customer_support_agent.agents.callbacks import OUT_OF_SCOPE_RESPONSE, auto_save_to_memory, out_of_scope_guard
 from customer_support_agent.agents.order_agent import order_agent
 
-# from customer_support_agent.agents.callbacks_sdk import auto_save_to_memory_sdk  # SDK-based (official approach)
 # Import domain agents
 from customer_support_agent.agents.product_agent import product_agent
+from customer_support_agent.agents.timed_agent_tool import TimedAgentTool
 
 # Import workflow agents
 from customer_support_agent.agents.workflow_agents import sequential_refund_workflow
@@ -35,7 +35,7 @@ root_agent = Agent(
     name=root_config["name"],
     model=root_config["model"],
     description=root_config["description"],
-    instruction="""You are a customer support coordinator. Route queries to the right specialist agent.
+    instruction=f"""You are a customer support coordinator. Route queries to the right specialist agent.
 
 ERROR HANDLING (CRITICAL):
 - If a specialist agent fails, times out, or returns an error, ALWAYS respond to the user
@@ -70,17 +70,18 @@ ROUTING RULES:
    IMPORTANT: ALWAYS check eligibility BEFORE asking for reason. This saves user time if order isn't refundable.
 
 5. **MULTI-DOMAIN** ("show me order X and its invoice", "track order X and payment status")
-   → Call MULTIPLE agents in sequence
-   → Example: "order and invoice" → call order_agent THEN billing_agent
+   → Call MULTIPLE agents in the SAME response (they run in parallel)
+   → Example: "order and invoice" → call order_agent AND billing_agent together
+   → Only call sequentially when one call needs the other's result
    → Combine responses into one coherent answer
    → If one agent fails, provide partial results from successful agents
 
 6. OUT-OF-SCOPE (weather, jokes, general questions)
-   → Respond: "I'm sorry, I can't help with that. I can assist with products, orders, and billing."
+   → Respond: "{OUT_OF_SCOPE_RESPONSE}"
 
 CRITICAL RULES:
 - ALWAYS provide a response to the user, even if agents fail
-- When user asks for multiple domains (order + invoice), call BOTH agents sequentially
+- When user asks for multiple domains (order + invoice), call BOTH agents in one response
 - Combine responses from multiple agents into one coherent answer
 - NEVER say "I can't provide X" and then provide X - be consistent
 - Trust specialist agents to handle their domain
@@ -95,11 +96,15 @@ EXAMPLES:
 - "The product is damaged" (after eligibility confirmed) → refund_workflow with order_id + reason""",
     tools=[
         preload_memory_tool.PreloadMemoryTool(),
-        AgentTool(product_agent),  # Handles ALL product complexity internally
-        AgentTool(order_agent),
-        AgentTool(billing_agent),
+        # Each specialist is bounded by its AGENT_CONFIGS timeout
+        TimedAgentTool(product_agent, timeout_s=get_agent_config("product_agent")["timeout"]),
+        TimedAgentTool(order_agent, timeout_s=get_agent_config("order_agent")["timeout"]),
+        TimedAgentTool(billing_agent, timeout_s=get_agent_config("billing_agent")["timeout"]),
         check_if_refundable,  # Pre-check refund eligibility before asking for reason
-        AgentTool(sequential_refund_workflow),  # Refund workflow (after eligibility + reason confirmed)
+        # Refund workflow (after eligibility + reason confirmed)
+        TimedAgentTool(sequential_refund_workflow, timeout_s=get_agent_config("sequential_refund")["timeout"]),
     ],
+    # Obvious off-topic messages are answered before the model is called
+    before_agent_callback=out_of_scope_guard,
     after_agent_callback=auto_save_to_memory,
 )
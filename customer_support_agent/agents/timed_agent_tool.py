@@ -0,0 +1,47 @@
+"""
+AgentTool with a per-agent time budget.
+
+AGENT_CONFIGS declares a timeout for every specialist. Wrapping the specialist
+in TimedAgentTool enforces it, so one slow sub-agent cannot consume the whole
+root agent budget. On timeout the root model receives a structured error
+result and falls back to its error-handling instructions.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+from google.adk.agents import BaseAgent
+from google.adk.tools import AgentTool, ToolContext
+
+logger = logging.getLogger(__name__)
+
+
+class TimedAgentTool(AgentTool):
+    """AgentTool that cancels the wrapped agent after timeout_s seconds."""
+
+    def __init__(self, agent: BaseAgent, timeout_s: float, **kwargs):
+        super().__init__(agent, **kwargs)
+        self.timeout_s = timeout_s
+
+    async def run_async(self, *, args: dict[str, Any], tool_context: ToolContext) -> Any:
+        start_time = time.perf_counter()
+        try:
+            return await asyncio.wait_for(
+                super().run_async(args=args, tool_context=tool_context),
+                timeout=self.timeout_s,
+            )
+        except asyncio.TimeoutError:
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            logger.warning(
+                "agent_timeout: %s exceeded %ss (elapsed %.0fms)",
+                self.agent.name,
+                self.timeout_s,
+                elapsed_ms,
+            )
+            return {
+                "status": "timeout",
+                "agent": self.agent.name,
+                "message": f"{self.agent.name} did not respond within {self.timeout_s} seconds",
+            }
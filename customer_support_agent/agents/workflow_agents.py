@@ -6,6 +6,13 @@ This module contains ParallelAgent, SequentialAgent, and LoopAgent patterns.
 
 from google.adk.agents import Agent, SequentialAgent
 
+from customer_support_agent.agents.callbacks import (
+    extract_requested_order_id,
+    record_refund_step,
+    refund_gate,
+    reset_refund_gates,
+)
+
 # Import centralized configuration
 from customer_support_agent.config import get_agent_config
 
@@ -23,6 +30,8 @@ validation_agent = Agent(
     description="Validates refund request: ownership, delivery status, and items in order",
     instruction=validator_config["instruction"],
     tools=[validate_refund_request],
+    before_agent_callback=[reset_refund_gates, extract_requested_order_id],
+    after_tool_callback=record_refund_step,
 )
 
 eligibility_config = get_agent_config("eligibility_checker")
@@ -32,6 +41,8 @@ eligibility_agent = Agent(
     description="Checks if the order is eligible for a refund based on business rules",
     instruction=eligibility_config["instruction"],
     tools=[check_refund_eligibility],
+    before_agent_callback=refund_gate,  # Skips the LLM turn if validation failed
+    after_tool_callback=record_refund_step,
 )
 
 refund_config = get_agent_config("refund_processor")
@@ -41,6 +52,7 @@ refund_processor = Agent(
     description="Processes the refund after validation and eligibility checks pass",
     instruction=refund_config["instruction"],
     tools=[process_refund],
+    before_agent_callback=refund_gate,  # Skips the LLM turn if validation or eligibility failed
 )
 
 sequential_refund_workflow = SequentialAgent(
@@ -42,9 +42,9 @@ def audit_log(
         details: Additional context
     """
     if success:
-        logger.info(f"[AUDIT] AUTHORIZED: {user_id} -> {action} on {resource_type}/{resource_id}")
+        logger.info("[AUDIT] AUTHORIZED: %s -> %s on %s/%s", user_id, action, resource_type, resource_id)
     else:
-        logger.warning(f"[AUDIT] DENIED: {user_id} -> {action} on {resource_type}/{resource_id} - {details}")
+        logger.warning("[AUDIT] DENIED: %s -> %s on %s/%s - %s", user_id, action, resource_type, resource_id, details)
 
 
 # =============================================================================
@@ -88,7 +88,7 @@ def requires_order_ownership(func: Callable) -> Callable:
                     break
 
         if tool_context is None:
-            logger.error(f"[AUTH] No tool_context provided to {func.__name__}")
+            logger.error("[AUTH] No tool_context provided to %s", func.__name__)
             return {"status": "error", "message": "Internal error: missing context"}
 
         user_id = tool_context.user_id
@@ -207,11 +207,11 @@ def requires_authenticated_user(func: Callable) -> Callable:
         user_id = tool_context.user_id
 
         if not user_id:
-            logger.warning(f"[AUTH] Unauthenticated access attempt to {func.__name__}")
+            logger.warning("[AUTH] Unauthenticated access attempt to %s", func.__name__)
             return {"status": "error", "message": "Authentication required"}
 
         # Log the action
-        logger.info(f"[AUTH] User {user_id} calling {func.__name__}")
+        logger.info("[AUTH] User %s calling %s", user_id, func.__name__)
 
         kwargs["_user_id"] = user_id
         return func(*args, **kwargs)
@@ -17,13 +17,13 @@ USAGE:
     )
 
 COST OPTIMIZATION:
-    - Main agents use gemini-2.5-pro for complex reasoning
-    - Sub-agents use gemini-2.5-flash for simple tool calls (10x cheaper)
+    - The root coordinator and sub-agents use gemini-2.5-flash (10x cheaper)
+    - gemini-2.5-pro is reserved for workflow agents with complex reasoning
     - Potential 40-60% cost reduction with no quality loss
 """
 
 import os
-from typing import Any, Dict
+from typing import Dict, NotRequired, TypedDict
 
 # =============================================================================
 # ENVIRONMENT CONFIGURATION
@@ -38,16 +38,18 @@ if not PROJECT_ID:
 
 LOCATION = os.environ.get("GOOGLE_CLOUD_LOCATION", "us-central1")
 FIRESTORE_DATABASE = os.environ.get("FIRESTORE_DATABASE", "customer-support-db")
+# Optional shared cache for tool results (e.g. redis://10.0.0.3:6379/0); per-process only when unset
+REDIS_URL = os.environ.get("REDIS_URL", "")
 ENVIRONMENT = os.environ.get("ENV", "production")
 
 # =============================================================================
 # MODEL CONFIGURATION
 # =============================================================================
 
-# Primary model for complex reasoning (root, domain, workflow agents)
+# Primary model for complex reasoning (workflow agents)
 DEFAULT_MODEL = "gemini-2.5-pro"
 
-# Fast model for simple tool calls (sub-agents)
+# Fast model for routing and simple tool calls (root and sub-agents)
 # gemini-2.5-flash is ~10x cheaper and sufficient for simple operations
 FAST_MODEL = "gemini-2.5-flash"
 
@@ -61,13 +63,26 @@ if ENVIRONMENT == "development":
 # AGENT CONFIGURATIONS
 # =============================================================================
 
-AGENT_CONFIGS = {
+class AgentConfig(TypedDict):
+    """One AGENT_CONFIGS entry (typed for static checking; a plain dict at runtime)."""
+
+    name: str
+    model: str
+    temperature: float
+    max_iterations: int  # Tool-calling iterations before the agent stops
+    timeout: int  # Seconds; enforced for specialists by TimedAgentTool
+    description: NotRequired[str]
+    instruction: NotRequired[str]
+
+
+AGENT_CONFIGS: Dict[str, AgentConfig] = {
     # =========================================================================
     # ROOT COORDINATOR AGENT
     # =========================================================================
     "root_agent": {
         "name": "customer_support",
-        "model": DEFAULT_MODEL,
+        # Routing plus short responses: Flash is fast enough, Pro adds latency and cost per turn
+        "model": FAST_MODEL,
         "description": "Multi-agent customer support system coordinator with routing capabilities",
         "temperature": 0.1,  # Low for consistent routing decisions
         "max_iterations": 10,  # Maximum tool calling iterations to prevent infinite loops
@@ -179,13 +194,15 @@ This tool verifies:
 - Order status is "Delivered" (can't refund in-transit/processing orders)
 - Requested items exist in the order (if specific items requested)
 
+ORDER ID (extracted from the request): {requested_order_id?}
+- Use it as-is. ONLY if it is empty, find the order ID in the conversation (format: ORD-XXXXX)
+
 EXTRACT FROM CONTEXT:
-- Find the order ID mentioned in the conversation (format: ORD-XXXXX or ORD-12345)
 - Optionally, find specific item IDs if user wants partial refund
 - Look in the current user message and previous messages
 
 THEN:
-- Call validate_refund_request(order_id="ORD-XXXXX") with the extracted order ID
+- Call validate_refund_request(order_id="ORD-XXXXX") with the order ID
 - Optionally include item_ids=["PROD-001"] if user specified specific items
 - DO NOT ask the user for the order ID if it's already in the conversation
 
@@ -203,9 +220,8 @@ This tool dynamically calculates eligibility based on:
 - Days since delivery (must be within 30-day return window)
 - Items not already refunded (prevents duplicate refunds)
 
-EXTRACT FROM CONTEXT:
-- Find the order ID mentioned in the conversation (format: ORD-XXXXX)
-- The order ID was validated in the previous step
+ORDER ID (validated in the previous step): {refund_order_id?}
+- Use it as-is, do not re-extract it from the conversation
 
 THEN:
 - Call check_refund_eligibility(order_id="ORD-XXXXX") with the order ID
@@ -237,8 +253,10 @@ ACCEPTABLE REASONS (product-related issues):
 NOT ACCEPTABLE REASONS (will be rejected):
 - "changed my mind", "no longer need", "found cheaper", "ordering mistake"
 
+ORDER ID (validated in the first step): {refund_order_id?}
+- Use it as-is, do not re-extract it from the conversation
+
 EXTRACT FROM CONTEXT:
-- Find the order ID mentioned in the conversation (format: ORD-XXXXX)
 - Find the refund reason mentioned by the user
 - Look through all previous messages in the conversation
 
@@ -293,6 +311,21 @@ RAG_CONFIG = {
     "fallback_to_keyword": True,
 }
 
+# =============================================================================
+# CONTEXT CACHE CONFIGURATION
+# =============================================================================
+# Gemini context caching for the static request prefix (system instruction +
+# tool declarations + earlier turns). Applied by deployment/deploy.py through
+# the ADK App; cached input tokens are billed at a discount and skip
+# re-processing. Gemini 2.5 only caches prefixes of 2048+ tokens.
+
+CONTEXT_CACHE_CONFIG = {
+    "enabled": os.environ.get("CONTEXT_CACHE_ENABLED", "true").lower() == "true",
+    "ttl_seconds": 1800,  # 30 minutes
+    "cache_intervals": 10,  # Invocations before the cache is refreshed
+    "min_tokens": 2048,  # Skip requests too small to be cached
+}
+
 # =============================================================================
 # LOGGING CONFIGURATION
 # =============================================================================
@@ -307,7 +340,7 @@ LOGGING_CONFIG = {
 # =============================================================================
 
 
-def get_agent_config(agent_key: str) -> Dict[str, Any]:
+def get_agent_config(agent_key: str) -> AgentConfig:
     """
     Get configuration for a specific agent.
 
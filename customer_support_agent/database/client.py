@@ -10,6 +10,7 @@ deployments where env vars may not be available at module import time.
 
 import logging
 import os
+from threading import Lock
 
 from dotenv import load_dotenv
 from google.cloud import firestore
@@ -24,6 +25,8 @@ load_dotenv()
 # =============================================================================
 
 _db_client = None
+# Tools run in worker threads, so the first calls can race to create the client
+_db_client_lock = Lock()
 
 
 def get_db_client() -> firestore.Client:
@@ -35,9 +38,11 @@ def get_db_client() -> firestore.Client:
     """
     global _db_client
     if _db_client is None:
-        database_id = os.getenv("FIRESTORE_DATABASE", "customer-support-db")
-        _db_client = firestore.Client(database=database_id)
-        logger.debug("Initialized Firestore client for database: %s", database_id)
+        with _db_client_lock:
+            if _db_client is None:
+                database_id = os.getenv("FIRESTORE_DATABASE", "customer-support-db")
+                _db_client = firestore.Client(database=database_id)
+                logger.debug("Initialized Firestore client for database: %s", database_id)
     return _db_client
 
 
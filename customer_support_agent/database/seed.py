@@ -434,6 +434,40 @@ def get_sample_data():
     }
 
 
+# Firestore caps a WriteBatch at 500 operations
+_MAX_BATCH_WRITES = 500
+
+
+def _commit_in_batches(db, writes) -> int:
+    """Apply writes in as few WriteBatch commits as possible.
+
+    Args:
+        db: Firestore client
+        writes: Iterable of (operation, document reference, data) where operation
+            is "set", "update" or "delete" (data is ignored for deletes)
+
+    Returns:
+        Number of writes applied
+    """
+    batch = db.batch()
+    pending = 0
+    total = 0
+    for operation, reference, data in writes:
+        if operation == "delete":
+            batch.delete(reference)
+        else:
+            getattr(batch, operation)(reference, data)
+        pending += 1
+        total += 1
+        if pending == _MAX_BATCH_WRITES:
+            batch.commit()
+            batch = db.batch()
+            pending = 0
+    if pending:
+        batch.commit()
+    return total
+
+
 def add_embeddings_to_products(db, location: str = "us-central1"):
     """Add vector embeddings to products for RAG semantic search.
 
@@ -453,6 +487,7 @@ def add_embeddings_to_products(db, location: str = "us-central1"):
         products = list(db.collection("products").stream())
         print(f"   Processing {len(products)} products...")
 
+        updates = []
         for doc in products:
             data = doc.to_dict()
 
@@ -469,8 +504,10 @@ def add_embeddings_to_products(db, location: str = "us-central1"):
             embeddings_response = genai_client.models.embed_content(model="text-embedding-004", contents=[search_text])
             embedding_vector = embeddings_response.embeddings[0].values
 
-            # Update product with embedding
-            doc.reference.update({"embedding": embedding_vector, "search_text": search_text})
+            updates.append(("update", doc.reference, {"embedding": embedding_vector, "search_text": search_text}))
+
+        # Update products with their embeddings
+        _commit_in_batches(db, updates)
 
         print(f"   ✓ Added embeddings to {len(products)} products")
 
@@ -503,18 +540,17 @@ def seed_firestore(project_id: str, database_id: str = "(default)", clear: bool
     if clear:
         print("\n⚠️  Clearing existing data...")
         for collection_name in data.keys():
-            docs = db.collection(collection_name).stream()
-            for doc in docs:
-                doc.reference.delete()
+            # list_documents() returns references only, without reading the documents
+            references = db.collection(collection_name).list_documents()
+            _commit_in_batches(db, (("delete", reference, None) for reference in references))
             print(f"   Cleared: {collection_name}")
 
     print("\n📦 Seeding collections...")
     for collection_name, documents in data.items():
         collection_ref = db.collection(collection_name)
-        count = 0
-        for doc_id, doc_data in documents.items():
-            collection_ref.document(doc_id).set(doc_data)
-            count += 1
+        count = _commit_in_batches(
+            db, (("set", collection_ref.document(doc_id), doc_data) for doc_id, doc_data in documents.items())
+        )
         print(f"   ✓ {collection_name}: {count} documents")
 
     # Add vector embeddings for RAG search
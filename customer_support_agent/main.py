@@ -50,13 +50,24 @@ PROJECT_ID = os.environ.get("GOOGLE_CLOUD_PROJECT")
 if not PROJECT_ID:
     raise ValueError("GOOGLE_CLOUD_PROJECT environment variable must be set")
 
-# Import the root agent (this will cascade import all agents and tools)
-from customer_support_agent.agents import root_agent  # noqa: E402
-
 # Export root agent as the primary interface
 # Note: 'agent' is an alias for AgentEvaluator compatibility
-agent = root_agent
 __all__ = ["root_agent", "agent"]
 
 logger = logging.getLogger(__name__)
-logger.debug("Customer Support Multi-Agent System loaded (project: %s)", PROJECT_ID)
+
+
+def __getattr__(name):
+    """
+    Import the root agent on first access (PEP 562).
+
+    Importing it cascades into every agent, tool, and the RAG stack, so that
+    happens when root_agent is first used rather than when this module is
+    imported. `from customer_support_agent.main import root_agent` works as before.
+    """
+    if name in ("root_agent", "agent"):
+        from customer_support_agent.agents import root_agent
+
+        logger.debug("Customer Support Multi-Agent System loaded (project: %s)", PROJECT_ID)
+        return root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -16,8 +16,12 @@ This provides the same semantic search functionality without requiring the vecto
 To re-enable vector search in the future, modify the search() method to use find_nearest.
 """
 
+import functools
 import logging
 import os
+import re
+import time
+from threading import Lock
 from typing import Dict, List, Optional
 
 from google.cloud import firestore
@@ -26,6 +30,8 @@ logger = logging.getLogger(__name__)
 from google import genai  # noqa: E402
 from google.api_core import exceptions, retry  # noqa: E402
 
+from customer_support_agent.database import get_db_client  # noqa: E402
+
 # Configure retry policy for transient errors
 # Handles: Rate limits (429), Server errors (500), Service unavailable (503), Gateway timeout (504)
 RETRY_POLICY = retry.Retry(
@@ -42,20 +48,85 @@ RETRY_POLICY = retry.Retry(
     ),
 )
 
+# Query text -> embedding, shared by all sessions in the process. Popular
+# searches ("laptops", "headphones") repeat across users, and each hit saves an
+# embedding API round-trip.
+QUERY_EMBEDDING_CACHE_SIZE = 512
+
+# Streaming the catalog costs one Firestore read per product, so every search
+# in the process reuses one snapshot of it (products, embedding matrix, row
+# norms) for this long. Reseeded products show up once the snapshot expires.
+PRODUCT_CATALOG_TTL_SECONDS = 300
+# The only product fields search reads; the rest (specs, keywords, search_text) are never sent
+_CATALOG_FIELDS = ["name", "price", "category", "description", "embedding"]
+# text-embedding-004 output size. Products whose stored embedding has another
+# size (or is all zeros) are left out of the catalog: they can't be stacked into
+# the matrix, and a zero norm would make every cosine similarity NaN.
+EMBEDDING_DIMENSION = 768
+
+# Category named in a query -> keywords a matching product's name/description/category contains
+_CATEGORY_KEYWORDS = {
+    "laptop": ["laptop", "notebook", "computer"],
+    "keyboard": ["keyboard"],
+    "mouse": ["mouse"],
+    "monitor": ["monitor", "display", "screen"],
+    "desk": ["desk"],
+    "chair": ["chair", "seating"],
+    "headset": ["headset", "headphone"],
+    "webcam": ["webcam", "camera"],
+    "microphone": ["microphone", "mic"],
+}
+# Substring match, like "laptop" in "laptops"; one scan finds every category
+_CATEGORY_PATTERN = re.compile("|".join(map(re.escape, _CATEGORY_KEYWORDS)), re.IGNORECASE)
+
+# "under $X", "below $X", "less than $X", "cheaper than $X", "max $X", "maximum $X"
+_PRICE_CONSTRAINT_PATTERN = re.compile(
+    r"(?:under|below|less than|cheaper than|max(?:imum)?)\s*\$?(\d+(?:\.\d+)?)", re.IGNORECASE
+)
+
+
+def _usable_embedding(value):
+    """Return (float32 vector, norm) for a stored embedding, or None if it can't be ranked."""
+    import numpy as np
+
+    try:
+        # float32 is the embedding model's precision; float64 would double the matrix for nothing
+        vector = np.asarray(value, dtype=np.float32)
+    except (TypeError, ValueError):
+        return None
+    if vector.shape != (EMBEDDING_DIMENSION,):
+        return None
+
+    norm = float(np.linalg.norm(vector))
+    if not np.isfinite(norm) or norm == 0.0:
+        return None
+    return vector, norm
+
 
 class RAGProductSearch:
     """Semantic search for products using vector embeddings with retry logic."""
 
-    def __init__(self, database_id: str, location: str = "us-central1"):
+    def __init__(self, database_id: str, location: str = "us-central1", db: Optional[firestore.Client] = None):
         self.database_id = database_id
         self.location = location
 
-        # Initialize Firestore (uses ADC for project)
-        self.db = firestore.Client(database=database_id)
+        # Reuse the caller's Firestore client when given (shares its gRPC channel),
+        # otherwise create one (uses ADC for project)
+        self.db = db if db is not None else firestore.Client(database=database_id)
 
         # Initialize genai client for embeddings
         self._genai_client = genai.Client(vertexai=True, location=location)
 
+        # Failed calls raise and are not cached
+        self._embed_query = functools.lru_cache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)(
+            self._generate_embedding_with_retry
+        )
+
+        self._catalog = None
+        self._catalog_loaded_at = 0.0
+        # Searches run in tool threads; the lock makes concurrent misses load once
+        self._catalog_lock = Lock()
+
     def _generate_embedding_with_retry(self, text: str) -> List[float]:
         """
         Generate embedding with automatic retry on transient errors.
@@ -81,7 +152,7 @@ class RAGProductSearch:
         try:
             return _generate()
         except Exception as e:
-            logger.debug(f"[RAG] Embedding generation failed after retries: {e}")
+            logger.debug("[RAG] Embedding generation failed after retries: %s", e)
             raise
 
     def _extract_category_keywords(self, query: str) -> List[str]:
@@ -90,28 +161,12 @@ class RAGProductSearch:
 
         Returns list of keywords that should match product name/category.
         """
-        query_lower = query.lower()
-
-        # Category keyword mapping
-        category_keywords = {
-            "laptop": ["laptop", "notebook", "computer"],
-            "keyboard": ["keyboard"],
-            "mouse": ["mouse"],
-            "monitor": ["monitor", "display", "screen"],
-            "desk": ["desk"],
-            "chair": ["chair", "seating"],
-            "headset": ["headset", "headphone"],
-            "webcam": ["webcam", "camera"],
-            "microphone": ["microphone", "mic"],
-        }
-
-        # Find matching categories
-        keywords = []
-        for key, vals in category_keywords.items():
-            if key in query_lower:
-                keywords.extend(vals)
-
-        return keywords
+        matched = {match.lower() for match in _CATEGORY_PATTERN.findall(query)}
+        if not matched:
+            return []
+
+        # Keep _CATEGORY_KEYWORDS order regardless of where categories appear in the query
+        return [keyword for key, vals in _CATEGORY_KEYWORDS.items() if key in matched for keyword in vals]
 
     def _filter_by_category(self, products: List[Dict], query: str) -> List[Dict]:
         """
@@ -124,7 +179,10 @@ class RAGProductSearch:
         if not category_keywords:
             return products  # No category filtering needed
 
-        logger.debug(f"[RAG] Filtering by category keywords: {category_keywords}")
+        logger.debug("[RAG] Filtering by category keywords: %s", category_keywords)
+
+        # Checked once, not per product: the per-product lines only matter when debugging
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
 
         # Score products by category match (STRICT filtering)
         filtered = []
@@ -148,14 +206,15 @@ class RAGProductSearch:
             if match_score > 0:
                 product["category_match_score"] = match_score
                 filtered.append(product)
-                logger.debug(f"[RAG]   ✓ Included: {name} (score={match_score})")
-            else:
-                logger.debug(f"[RAG]   ✗ Excluded: {name} (no keyword match)")
+                if debug_enabled:
+                    logger.debug("[RAG]   ✓ Included: %s (score=%s)", name, match_score)
+            elif debug_enabled:
+                logger.debug("[RAG]   ✗ Excluded: %s (no keyword match)", name)
 
         # Sort by category match first, then similarity
         filtered.sort(key=lambda x: (x.get("category_match_score", 0), x.get("similarity", 0)), reverse=True)
 
-        logger.debug(f"[RAG] Category filter: {len(products)} → {len(filtered)} products")
+        logger.debug("[RAG] Category filter: %s → %s products", len(products), len(filtered))
 
         return filtered
 
@@ -167,25 +226,11 @@ class RAGProductSearch:
         - "laptops under $600" → 600.0
         - "products below 500" → 500.0
         - "under $1000" → 1000.0
+        - "below $49.99" → 49.99
         """
-        import re
-
-        query_lower = query.lower()
-
-        # Pattern: "under $X", "below $X", "less than $X", "cheaper than $X"
-        patterns = [
-            r"under\s*\$?(\d+)",
-            r"below\s*\$?(\d+)",
-            r"less than\s*\$?(\d+)",
-            r"cheaper than\s*\$?(\d+)",
-            r"max\s*\$?(\d+)",
-            r"maximum\s*\$?(\d+)",
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, query_lower)
-            if match:
-                return float(match.group(1))
+        match = _PRICE_CONSTRAINT_PATTERN.search(query)
+        if match:
+            return float(match.group(1))
 
         return None  # No price constraint found
 
@@ -206,15 +251,15 @@ class RAGProductSearch:
             max_price = self._extract_price_constraint(query)
 
         if max_price:
-            logger.debug(f"[RAG] Filtering by price: max ${max_price}")
+            logger.debug("[RAG] Filtering by price: max $%s", max_price)
 
-        logger.debug(f"[RAG] Search query: '{query}'")
+        logger.debug("[RAG] Search query: '%s'", query)
 
-        # Generate query embedding with retry logic
+        # Generate query embedding with retry logic (cached per query text)
         try:
-            query_embedding = self._generate_embedding_with_retry(query)
+            query_embedding = self._embed_query(query)
         except Exception as e:
-            logger.debug(f"[RAG] Failed to generate embedding, using fallback: {e}")
+            logger.debug("[RAG] Failed to generate embedding, using fallback: %s", e)
             # Fallback: return empty results rather than crashing
             return []
 
@@ -223,6 +268,67 @@ class RAGProductSearch:
         logger.debug("[RAG] Using fallback cosine similarity search (vector index not working)")
         return self._fallback_search(query_embedding, limit, query, max_price)
 
+    def _get_catalog(self):
+        """
+        Return (products, embedding matrix, embedding norms) for all products with embeddings.
+
+        Loaded from Firestore at most once per PRODUCT_CATALOG_TTL_SECONDS.
+        """
+        import numpy as np
+
+        with self._catalog_lock:
+            now = time.monotonic()
+            if self._catalog is not None and now - self._catalog_loaded_at < PRODUCT_CATALOG_TTL_SECONDS:
+                return self._catalog
+
+            products = []
+            embeddings = []
+            norms = []
+            skipped = 0
+
+            # Get all products with embeddings
+            for doc in self.db.collection("products").select(_CATALOG_FIELDS).stream():
+                data = doc.to_dict()
+
+                if "embedding" not in data:
+                    continue
+
+                usable = _usable_embedding(data["embedding"])
+                if usable is None:
+                    skipped += 1
+                    continue
+                embedding, norm = usable
+
+                products.append(
+                    {
+                        "id": doc.id,
+                        "name": data.get("name"),
+                        "price": data.get("price"),
+                        "category": data.get("category"),
+                        "description": data.get("description"),
+                    }
+                )
+                embeddings.append(embedding)
+                norms.append(norm)
+
+            if skipped:
+                logger.warning("[RAG] Skipped %s products with a malformed or zero embedding", skipped)
+
+            if products:
+                product_matrix = np.stack(embeddings)
+            else:
+                product_matrix = np.empty((0, EMBEDDING_DIMENSION), dtype=np.float32)
+            product_norms = np.asarray(norms, dtype=np.float32)
+            self._catalog = (products, product_matrix, product_norms)
+            self._catalog_loaded_at = now
+            logger.debug("[RAG] Loaded %s products into the catalog snapshot", len(products))
+            return self._catalog
+
+    def clear_catalog_cache(self) -> None:
+        """Drop the catalog snapshot so the next search reloads it (e.g. after reseeding)."""
+        with self._catalog_lock:
+            self._catalog = None
+
     def _fallback_search(
         self, query_embedding: List[float], limit: int, query: str, max_price: Optional[float] = None
     ) -> List[Dict]:
@@ -232,36 +338,25 @@ class RAGProductSearch:
         """
         import numpy as np
 
-        all_products = []
-        query_vec = np.array(query_embedding)
-
-        # Get all products with embeddings
-        for doc in self.db.collection("products").stream():
-            data = doc.to_dict()
-
-            if "embedding" not in data:
-                continue
-
-            # Calculate cosine similarity
-            product_vec = np.array(data["embedding"])
-            similarity = np.dot(query_vec, product_vec) / (np.linalg.norm(query_vec) * np.linalg.norm(product_vec))
-
-            all_products.append(
-                {
-                    "id": doc.id,
-                    "name": data.get("name"),
-                    "price": data.get("price"),
-                    "category": data.get("category"),
-                    "description": data.get("description"),
-                    "similarity": float(similarity),
-                }
-            )
+        products, product_matrix, product_norms = self._get_catalog()
+        if not products:
+            return []
+
+        # Cosine similarity of every product at once: one (N, d) @ (d,) product
+        query_vec = np.asarray(query_embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query_vec)
+        if query_vec.shape != (EMBEDDING_DIMENSION,) or not query_norm:
+            logger.warning("[RAG] Unusable query embedding (shape %s), returning no results", query_vec.shape)
+            return []
+        similarities = (product_matrix @ query_vec) / (product_norms * query_norm)
 
-        # Sort by similarity
-        all_products.sort(key=lambda x: x["similarity"], reverse=True)
+        # Get more results for filtering: partition out the top limit * 3, then sort only those
+        top_count = min(limit * 3, len(products))
+        top_indices = np.argpartition(-similarities, top_count - 1)[:top_count]
+        top_indices = top_indices[np.argsort(-similarities[top_indices], kind="stable")]
 
-        # Get more results for filtering
-        top_products = all_products[: limit * 3]
+        # Fresh dicts per search: the catalog snapshot is shared and the filters annotate results
+        top_products = [{**products[i], "similarity": float(similarities[i])} for i in top_indices.tolist()]
 
         # Filter by category
         filtered = self._filter_by_category(top_products, query)
@@ -271,30 +366,35 @@ class RAGProductSearch:
             before_price_filter = len(filtered)
             filtered = [p for p in filtered if p.get("price", float("inf")) <= max_price]
             logger.debug(
-                f"[RAG] After price filter: {before_price_filter} → {len(filtered)} products under ${max_price}"
+                "[RAG] After price filter: %s → %s products under $%s", before_price_filter, len(filtered), max_price
             )
-            if filtered:
-                logger.debug(f"[RAG] Products under ${max_price}:")
+            if filtered and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[RAG] Products under $%s:", max_price)
                 for p in filtered:
-                    logger.debug(f"[RAG]   - {p.get('name')}: ${p.get('price')}")
+                    logger.debug("[RAG]   - %s: $%s", p.get("name"), p.get("price"))
 
         # If filtering removed all results, fall back to original
         if not filtered:
             logger.debug("[RAG] Filters removed all results, using unfiltered")
-            return all_products[:limit]
+            return top_products[:limit]
 
         return filtered[:limit]
 
 
 # Global instance (initialized lazily)
 _rag_search = None
+# search_products runs in tool threads, so the first searches can race to create it
+_rag_search_lock = Lock()
 
 
 def get_rag_search() -> RAGProductSearch:
     """Get or create RAG search instance."""
     global _rag_search
     if _rag_search is None:
-        database_id = os.environ.get("FIRESTORE_DATABASE", "customer-support-db")
-        location = os.environ.get("GOOGLE_CLOUD_LOCATION", "us-central1")
-        _rag_search = RAGProductSearch(database_id, location)
+        with _rag_search_lock:
+            if _rag_search is None:
+                database_id = os.environ.get("FIRESTORE_DATABASE", "customer-support-db")
+                location = os.environ.get("GOOGLE_CLOUD_LOCATION", "us-central1")
+                # Same FIRESTORE_DATABASE as the tools' client, so share its connection
+                _rag_search = RAGProductSearch(database_id, location, db=get_db_client())
     return _rag_search
@@ -83,20 +83,20 @@ def get_my_invoices(tool_context: ToolContext, _user_id: str = None, **kwargs) -
         tool_context: ADK ToolContext (automatically injected)
         _user_id: Authenticated user ID (injected by decorator)
     """
-    logger.info(f"[BILLING] Fetching all invoices for user: {_user_id}")
+    logger.info("[BILLING] Fetching all invoices for user: %s", _user_id)
 
     query = db_client.collection("invoices").where(filter=FieldFilter("customer_id", "==", _user_id))
     invoices = [{"invoice_id": doc.id, **doc.to_dict()} for doc in query.stream()]
 
     if invoices:
-        logger.info(f"[BILLING] Found {len(invoices)} invoices for user {_user_id}")
+        logger.info("[BILLING] Found %s invoices for user %s", len(invoices), _user_id)
         return {
             "status": "success",
             "invoices": invoices,
             "total_invoices": len(invoices),
         }
 
-    logger.info(f"[BILLING] No invoices found for user {_user_id}")
+    logger.info("[BILLING] No invoices found for user %s", _user_id)
     return {
         "status": "no_invoices",
         "message": "No invoices found for your account.",
@@ -135,20 +135,20 @@ def get_my_payments(tool_context: ToolContext, _user_id: str = None, **kwargs) -
         tool_context: ADK ToolContext (automatically injected)
         _user_id: Authenticated user ID (injected by decorator)
     """
-    logger.info(f"[BILLING] Fetching all payments for user: {_user_id}")
+    logger.info("[BILLING] Fetching all payments for user: %s", _user_id)
 
     query = db_client.collection("payments").where(filter=FieldFilter("customer_id", "==", _user_id))
     payments = [{"order_id": doc.id, **doc.to_dict()} for doc in query.stream()]
 
     if payments:
-        logger.info(f"[BILLING] Found {len(payments)} payments for user {_user_id}")
+        logger.info("[BILLING] Found %s payments for user %s", len(payments), _user_id)
         return {
             "status": "success",
             "payments": payments,
             "total_payments": len(payments),
         }
 
-    logger.info(f"[BILLING] No payments found for user {_user_id}")
+    logger.info("[BILLING] No payments found for user %s", _user_id)
     return {
         "status": "no_payments",
         "message": "No payment records found for your account.",
@@ -105,7 +105,7 @@ def get_order_history(tool_context: ToolContext, _user_id: str = None, **kwargs)
         tool_context: ADK ToolContext (automatically injected)
         _user_id: Authenticated user ID (injected by decorator)
     """
-    logger.info(f"[ORDER HISTORY] Fetching full order history for user: {_user_id}")
+    logger.info("[ORDER HISTORY] Fetching full order history for user: %s", _user_id)
 
     query = db_client.collection("orders").where(filter=FieldFilter("customer_id", "==", _user_id))
     orders = [{"order_id": doc.id, **doc.to_dict()} for doc in query.stream()]
@@ -126,14 +126,14 @@ def get_order_history(tool_context: ToolContext, _user_id: str = None, **kwargs)
                 }
             )
 
-        logger.info(f"[ORDER HISTORY] Found {len(detailed_orders)} orders for user {_user_id}")
+        logger.info("[ORDER HISTORY] Found %s orders for user %s", len(detailed_orders), _user_id)
         return {
             "status": "success",
             "orders": detailed_orders,
             "total_orders": len(detailed_orders),
         }
 
-    logger.info(f"[ORDER HISTORY] No orders found for user {_user_id}")
+    logger.info("[ORDER HISTORY] No orders found for user %s", _user_id)
     return {
         "status": "no_orders",
         "message": "No orders found for your account.",
@@ -151,7 +151,7 @@ def get_my_order_history(tool_context: ToolContext, _user_id: str = None, **kwar
         tool_context: ADK ToolContext (automatically injected)
         _user_id: Authenticated user ID (injected by decorator)
     """
-    logger.info(f"[ORDER HISTORY] Fetching order summary for user: {_user_id}")
+    logger.info("[ORDER HISTORY] Fetching order summary for user: %s", _user_id)
 
     query = db_client.collection("orders").where(filter=FieldFilter("customer_id", "==", _user_id))
     orders = [{"order_id": doc.id, **doc.to_dict()} for doc in query.stream()]
@@ -161,10 +161,10 @@ def get_my_order_history(tool_context: ToolContext, _user_id: str = None, **kwar
             {"order_id": o["order_id"], "date": o.get("date"), "total": o.get("total"), "status": o.get("status")}
             for o in orders
         ]
-        logger.info(f"[ORDER HISTORY] Found {len(summaries)} orders for user {_user_id}")
+        logger.info("[ORDER HISTORY] Found %s orders for user %s", len(summaries), _user_id)
         return {"status": "success", "orders": summaries}
 
-    logger.info(f"[ORDER HISTORY] No orders found for user {_user_id}")
+    logger.info("[ORDER HISTORY] No orders found for user %s", _user_id)
     return {
         "status": "no_orders",
         "message": "No orders found for your account.",
@@ -4,6 +4,7 @@ Product-related tools for the customer support system.
 This module contains all tools for product search, details, inventory, and reviews.
 """
 
+import asyncio
 import logging
 
 from google.adk.tools.tool_context import ToolContext
@@ -13,6 +14,12 @@ logger = logging.getLogger(__name__)
 # Import database client
 from customer_support_agent.database import db_client  # noqa: E402
 
+# Import session state helper (writes only changed keys)
+from customer_support_agent.tools.session_state import update_state  # noqa: E402
+
+# Import result cache for read-only catalog lookups
+from customer_support_agent.tools.tool_cache import cached_tool  # noqa: E402
+
 # Import validation utilities
 from customer_support_agent.tools.validation import (  # noqa: E402
     validate_product_id,
@@ -30,6 +37,14 @@ except Exception as e:
     logger.debug("RAG search not available in product_tools: %s", e)
     USE_RAG = False
 
+# Catalog cache TTLs: details and reviews change rarely, stock levels do
+PRODUCT_DETAILS_TTL_SECONDS = 3600
+PRODUCT_REVIEWS_TTL_SECONDS = 900
+INVENTORY_TTL_SECONDS = 30
+
+# Products fetched at once by get_all_saved_products_info (each is 3 Firestore reads)
+_MAX_CONCURRENT_PRODUCT_FETCHES = 10
+
 
 def search_products(query: str, tool_context: ToolContext) -> dict:
     """Search for products using RAG (semantic) or keyword fallback.
@@ -54,15 +69,20 @@ def search_products(query: str, tool_context: ToolContext) -> dict:
             if products:
                 # Save first product to persistent session state
                 if len(products) > 0 and "id" in products[0]:
-                    tool_context.state["last_product_id"] = products[0]["id"]
-                    tool_context.state["last_product_name"] = products[0].get("name", "")
-                    tool_context.state["last_search_query"] = query
+                    update_state(
+                        tool_context.state,
+                        {
+                            "last_product_id": products[0]["id"],
+                            "last_product_name": products[0].get("name", ""),
+                            "last_search_query": query,
+                        },
+                    )
                     logger.debug("Session state saved: %s - %s", products[0]["id"], products[0].get("name"))
 
                 # Save ALL product IDs for multi-product details loop
                 product_ids = [p["id"] for p in products if "id" in p]
-                tool_context.state["products_to_detail"] = product_ids
-                tool_context.state["detailed_product_ids"] = []  # Reset for new search
+                # detailed_product_ids is reset for the new search
+                update_state(tool_context.state, {"products_to_detail": product_ids, "detailed_product_ids": []})
                 logger.debug("Saved %d product IDs for multi-detail: %s", len(product_ids), product_ids)
 
                 return {"status": "success", "products": products, "count": len(products), "method": "RAG"}
@@ -97,21 +117,27 @@ def search_products(query: str, tool_context: ToolContext) -> dict:
     if results:
         # Save first result to persistent session state
         if len(results) > 0:
-            tool_context.state["last_product_id"] = results[0]["id"]
-            tool_context.state["last_product_name"] = results[0]["name"]
-            tool_context.state["last_search_query"] = query
+            update_state(
+                tool_context.state,
+                {
+                    "last_product_id": results[0]["id"],
+                    "last_product_name": results[0]["name"],
+                    "last_search_query": query,
+                },
+            )
             logger.debug("Session state saved: %s - %s", results[0]["id"], results[0]["name"])
 
         # Save ALL product IDs for multi-product details loop
         product_ids = [p["id"] for p in results if "id" in p]
-        tool_context.state["products_to_detail"] = product_ids
-        tool_context.state["detailed_product_ids"] = []  # Reset for new search
+        # detailed_product_ids is reset for the new search
+        update_state(tool_context.state, {"products_to_detail": product_ids, "detailed_product_ids": []})
         logger.debug("Saved %d product IDs for multi-detail: %s", len(product_ids), product_ids)
 
         return {"status": "success", "products": results, "count": len(results), "method": "keyword"}
     return {"status": "no_results", "message": f"No products found matching '{query}'"}
 
 
+@cached_tool(ttl_seconds=PRODUCT_DETAILS_TTL_SECONDS)
 def get_product_details(product_id: str) -> dict:
     """Get detailed information about a specific product by its ID.
 
@@ -167,6 +193,7 @@ def get_last_mentioned_product(tool_context: ToolContext) -> dict:
     return {"status": "not_found", "message": f"Product {last_product_id} not found"}
 
 
+@cached_tool(ttl_seconds=INVENTORY_TTL_SECONDS)
 def check_inventory(product_id: str) -> dict:
     """Check inventory levels.
 
@@ -184,6 +211,7 @@ def check_inventory(product_id: str) -> dict:
     return {"status": "not_found"}
 
 
+@cached_tool(ttl_seconds=PRODUCT_REVIEWS_TTL_SECONDS)
 def get_product_reviews(product_id: str) -> dict:
     """Get customer reviews for a product.
 
@@ -201,7 +229,7 @@ def get_product_reviews(product_id: str) -> dict:
     return {"status": "not_found"}
 
 
-def get_all_saved_products_info(tool_context: ToolContext) -> dict:
+async def get_all_saved_products_info(tool_context: ToolContext) -> dict:
     """
     Get comprehensive information for ALL products from the last search.
 
@@ -213,7 +241,9 @@ def get_all_saved_products_info(tool_context: ToolContext) -> dict:
     - User wants information about multiple products from the previous search
 
     This is MORE EFFICIENT than using LoopAgent because it fetches directly
-    without iteration overhead and timeout issues.
+    without iteration overhead and timeout issues. Products are fetched
+    concurrently (at most _MAX_CONCURRENT_PRODUCT_FETCHES at a time), so the
+    call takes about as long as the slowest single product.
 
     Args:
         tool_context: ADK ToolContext (automatically injected)
@@ -230,9 +260,16 @@ def get_all_saved_products_info(tool_context: ToolContext) -> dict:
 
     results = {"status": "success", "count": len(products_to_detail), "products": []}
 
-    # Fetch comprehensive info for each product
-    for product_id in products_to_detail:
-        product_info = get_product_info(product_id)
+    # Fetch comprehensive info for all products concurrently (Firestore client calls block, so run in threads)
+    semaphore = asyncio.Semaphore(_MAX_CONCURRENT_PRODUCT_FETCHES)
+
+    async def fetch_product_info(product_id):
+        async with semaphore:
+            return await asyncio.to_thread(get_product_info, product_id)
+
+    product_infos = await asyncio.gather(*(fetch_product_info(product_id) for product_id in products_to_detail))
+
+    for product_id, product_info in zip(products_to_detail, product_infos):
         if product_info.get("status") == "success":
             results["products"].append(product_info)
         else:
@@ -0,0 +1,24 @@
+"""
+Session state helpers for tools and callbacks.
+
+Every assignment to ADK session state is recorded in the event's state_delta
+and persisted by the session service, even when the value did not change.
+Tools that save the same values again (a repeated search, the refund steps
+re-checking the same order) write through update_state so only changed keys
+are sent.
+"""
+
+_MISSING = object()
+
+
+def update_state(state, updates: dict) -> None:
+    """
+    Write the keys of updates whose value differs from the current state.
+
+    Args:
+        state: ADK session state (tool_context.state / callback_context.state)
+        updates: Key/value pairs to store
+    """
+    for key, value in updates.items():
+        if state.get(key, _MISSING) != value:
+            state[key] = value
@@ -0,0 +1,171 @@
+"""
+TTL cache for read-only tool lookups.
+
+Product catalog tools are called repeatedly with the same product_id within
+and across turns (get_product_info fans out to details + inventory + reviews,
+and get_all_saved_products_info does that for every search result). Caching
+their results avoids the repeated Firestore reads.
+
+Results are cached per process and, when REDIS_URL is configured, in Redis
+too, so every instance of a scaled-out deployment shares one warm cache. If
+Redis is unreachable the tools keep working on the per-process cache alone.
+
+Only apply @cached_tool to global, read-only lookups. User-scoped tools
+(orders, billing, refunds) verify ownership per call and must never be cached,
+and neither must anything that writes (process_refund).
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from customer_support_agent.config import REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+# Results with these statuses are cached; validation errors are cheap and not stored
+_CACHEABLE_STATUSES = ("success", "not_found")
+
+_cached_tools = []
+
+# Redis must answer fast or be skipped: it sits in front of a Firestore read
+_REDIS_TIMEOUT_SECONDS = 0.25
+# After a Redis error, use the per-process cache only for this long
+_REDIS_RETRY_SECONDS = 30.0
+_REDIS_KEY_PREFIX = "tool:"
+
+_redis = None
+_redis_retry_at = 0.0
+
+
+def _get_redis():
+    """Get or create the process-wide Redis client, or None if not configured or recently failing."""
+    global _redis
+
+    if not REDIS_URL or time.monotonic() < _redis_retry_at:
+        return None
+
+    if _redis is None:
+        import redis
+
+        _redis = redis.Redis.from_url(
+            REDIS_URL,
+            socket_timeout=_REDIS_TIMEOUT_SECONDS,
+            socket_connect_timeout=_REDIS_TIMEOUT_SECONDS,
+        )
+    return _redis
+
+
+def _redis_failed(error) -> None:
+    """Skip Redis for a while so an outage doesn't add a timeout to every tool call."""
+    global _redis_retry_at
+
+    _redis_retry_at = time.monotonic() + _REDIS_RETRY_SECONDS
+    logger.warning("Tool cache Redis unavailable, using per-process cache for %ss: %s", _REDIS_RETRY_SECONDS, error)
+
+
+def _redis_get(redis_key):
+    """Return (result, remaining TTL in seconds), or (None, 0) on a miss."""
+    redis_client = _get_redis()
+    if redis_client is None:
+        return None, 0
+
+    try:
+        # GET and PTTL in one round-trip
+        cached, ttl_ms = redis_client.pipeline(transaction=False).get(redis_key).pttl(redis_key).execute()
+    except Exception as e:
+        _redis_failed(e)
+        return None, 0
+
+    if cached is None or ttl_ms <= 0:
+        return None, 0
+    return json.loads(cached), ttl_ms / 1000
+
+
+def _redis_set(redis_key, result, ttl_seconds) -> None:
+    redis_client = _get_redis()
+    if redis_client is None:
+        return
+    try:
+        # default=str: Firestore timestamps are stored as strings
+        redis_client.set(redis_key, json.dumps(result, default=str), ex=int(ttl_seconds))
+    except Exception as e:
+        _redis_failed(e)
+
+
+def cached_tool(ttl_seconds: float, maxsize: int = 1024):
+    """
+    Cache a tool's result dict for ttl_seconds, keyed by its bound arguments.
+
+    The wrapper keeps the tool's signature and docstring (functools.wraps), so
+    ADK builds the same function declaration for it. Cached dicts are shared
+    between callers and must not be mutated.
+
+    Args:
+        ttl_seconds: How long a result stays fresh
+        maxsize: Maximum number of cached argument combinations (LRU eviction)
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        cache = OrderedDict()
+        lock = Lock()
+        redis_key_prefix = f"{_REDIS_KEY_PREFIX}{func.__name__}:"
+
+        def cache_locally(key, result, expires_at):
+            with lock:
+                cache[key] = (expires_at, result)
+                cache.move_to_end(key)
+                if len(cache) > maxsize:
+                    cache.popitem(last=False)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Normalize positional/keyword/default arguments into one key
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(bound.arguments.items())
+            now = time.monotonic()
+
+            with lock:
+                entry = cache.get(key)
+                if entry is not None and entry[0] > now:
+                    cache.move_to_end(key)
+                    return entry[1]
+
+            redis_key = redis_key_prefix + hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+            result, remaining_ttl = _redis_get(redis_key)
+            if result is not None:
+                # Expire locally when the shared entry does
+                cache_locally(key, result, now + remaining_ttl)
+                return result
+
+            result = func(*args, **kwargs)
+
+            if result.get("status") in _CACHEABLE_STATUSES:
+                cache_locally(key, result, now + ttl_seconds)
+                _redis_set(redis_key, result, ttl_seconds)
+
+            return result
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+
+        wrapper.cache_clear = cache_clear
+        _cached_tools.append(wrapper)
+        return wrapper
+
+    return decorator
+
+
+def clear_tool_caches() -> None:
+    """Drop every per-process cached tool result (e.g. after reseeding the catalog, or between tests)."""
+    for tool in _cached_tools:
+        tool.cache_clear()
+    logger.debug("Cleared %d tool caches", len(_cached_tools))
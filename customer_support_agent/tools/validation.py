@@ -29,9 +29,15 @@ PRODUCT_ID_PATTERN = re.compile(r"^PROD-\d{3,10}$")
 INVOICE_ID_PATTERN = re.compile(r"^INV-\d{4}-\d{3,10}$")
 REFUND_ID_PATTERN = re.compile(r"^REF-\d{5,10}-\d{2}$")
 
+# Finds order IDs inside free text (e.g. the refund request message)
+ORDER_ID_SEARCH_PATTERN = re.compile(r"\bORD-\d{5,10}\b")
+
 # Safe characters for search queries (alphanumeric, spaces, basic punctuation)
 SAFE_QUERY_PATTERN = re.compile(r'^[a-zA-Z0-9\s\-$.,!?\'"()]+$')
 
+# Refund reasons allow more characters (users describe problems)
+SAFE_REASON_PATTERN = re.compile(r'^[a-zA-Z0-9\s\-.,!?\'"()/:;]+$')
+
 
 # =============================================================================
 # VALIDATION FUNCTIONS
@@ -173,8 +179,7 @@ def validate_refund_reason(reason: str) -> Tuple[bool, Optional[str]]:
     if len(reason) > MAX_REASON_LENGTH:
         return False, f"Refund reason too long (max {MAX_REASON_LENGTH} characters)"
 
-    # Allow more characters in reason (users describe problems)
-    if not re.match(r'^[a-zA-Z0-9\s\-.,!?\'"()/:;]+$', reason):
+    if not SAFE_REASON_PATTERN.match(reason):
         return False, "Refund reason contains invalid characters"
 
     return True, None
@@ -212,5 +217,5 @@ def validation_error_response(error_message: str) -> dict:
     Returns:
         Error response dict
     """
-    logger.warning(f"[VALIDATION] {error_message}")
+    logger.warning("[VALIDATION] %s", error_message)
     return {"status": "validation_error", "message": error_message}
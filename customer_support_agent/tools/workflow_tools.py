@@ -19,6 +19,7 @@ from google.adk.tools.tool_context import ToolContext
 
 from customer_support_agent.auth import audit_log, verify_order_ownership
 from customer_support_agent.database import db_client
+from customer_support_agent.tools.session_state import update_state
 from customer_support_agent.tools.validation import (
     validate_order_id,
     validate_refund_reason,
@@ -215,13 +216,13 @@ def validate_refund_request(order_id: str, tool_context: ToolContext, item_ids:
         return validation_error_response(error_msg)
 
     user_id = tool_context.user_id
-    logger.info(f"[Refund Workflow - Step 1] User {user_id} validating refund for order: {order_id}")
+    logger.info("[Refund Workflow - Step 1] User %s validating refund for order: %s", user_id, order_id)
 
     # Verify ownership
     is_authorized, order_data, error_msg = verify_order_ownership(order_id, user_id, action="validate_refund_request")
 
     if not is_authorized:
-        logger.warning(f"[Refund Workflow - Step 1] STOPPING - {error_msg}")
+        logger.warning("[Refund Workflow - Step 1] STOPPING - %s", error_msg)
         tool_context.actions.escalate = True
         if "not found" in error_msg.lower():
             return {"status": "invalid", "message": error_msg}
@@ -230,7 +231,7 @@ def validate_refund_request(order_id: str, tool_context: ToolContext, item_ids:
     # Check order status - must be delivered
     order_status = order_data.get("status", "").lower()
     if order_status != "delivered":
-        logger.warning(f"[Refund Workflow - Step 1] Order {order_id} status is '{order_status}', not delivered")
+        logger.warning("[Refund Workflow - Step 1] Order %s status is '%s', not delivered", order_id, order_status)
         tool_context.actions.escalate = True
 
         if order_status == "processing":
@@ -254,7 +255,7 @@ def validate_refund_request(order_id: str, tool_context: ToolContext, item_ids:
     # Get order items
     order_items = order_data.get("items", [])
     if not order_items:
-        logger.error(f"[Refund Workflow - Step 1] Order {order_id} has no items")
+        logger.error("[Refund Workflow - Step 1] Order %s has no items", order_id)
         tool_context.actions.escalate = True
         return {"status": "error", "message": "Order has no items to refund"}
 
@@ -262,7 +263,7 @@ def validate_refund_request(order_id: str, tool_context: ToolContext, item_ids:
     if item_ids:
         is_valid, items_to_refund, error_msg = _validate_items_in_order(order_items, item_ids)
         if not is_valid:
-            logger.warning(f"[Refund Workflow - Step 1] {error_msg}")
+            logger.warning("[Refund Workflow - Step 1] %s", error_msg)
             tool_context.actions.escalate = True
             return {
                 "status": "invalid_items",
@@ -274,11 +275,12 @@ def validate_refund_request(order_id: str, tool_context: ToolContext, item_ids:
         items_to_refund = order_items
 
     # Store items to refund in session state for next steps
-    tool_context.state["refund_order_id"] = order_id
-    tool_context.state["refund_items"] = items_to_refund
-    tool_context.state["refund_order_data"] = order_data
+    update_state(
+        tool_context.state,
+        {"refund_order_id": order_id, "refund_items": items_to_refund, "refund_order_data": order_data},
+    )
 
-    logger.info(f"[Refund Workflow - Step 1] Validated {len(items_to_refund)} items for refund")
+    logger.info("[Refund Workflow - Step 1] Validated %s items for refund", len(items_to_refund))
 
     return {
         "status": "valid",
@@ -314,13 +316,13 @@ def check_refund_eligibility(order_id: str, tool_context: ToolContext) -> dict:
         return validation_error_response(error_msg)
 
     user_id = tool_context.user_id
-    logger.info(f"[Refund Workflow - Step 2] Checking eligibility for order: {order_id}")
+    logger.info("[Refund Workflow - Step 2] Checking eligibility for order: %s", order_id)
 
     # Re-verify ownership (defense in depth)
     is_authorized, order_data, error_msg = verify_order_ownership(order_id, user_id, action="check_refund_eligibility")
 
     if not is_authorized:
-        logger.warning(f"[Refund Workflow - Step 2] STOPPING - {error_msg}")
+        logger.warning("[Refund Workflow - Step 2] STOPPING - %s", error_msg)
         tool_context.actions.escalate = True
         return {"status": "unauthorized", "message": error_msg}
 
@@ -330,7 +332,7 @@ def check_refund_eligibility(order_id: str, tool_context: ToolContext) -> dict:
     # Check 1: Delivery date and return window
     delivered_date_str = order_data.get("delivered_date")
     if not delivered_date_str:
-        logger.warning(f"[Refund Workflow - Step 2] No delivery date for order {order_id}")
+        logger.warning("[Refund Workflow - Step 2] No delivery date for order %s", order_id)
         tool_context.actions.escalate = True
         return {
             "status": "not_eligible",
@@ -385,10 +387,9 @@ def check_refund_eligibility(order_id: str, tool_context: ToolContext) -> dict:
     refund_amount = _calculate_refund_amount(eligible_items)
 
     # Store eligible items in session state
-    tool_context.state["eligible_items"] = eligible_items
-    tool_context.state["refund_amount"] = refund_amount
+    update_state(tool_context.state, {"eligible_items": eligible_items, "refund_amount": refund_amount})
 
-    logger.info(f"[Refund Workflow - Step 2] {len(eligible_items)} items eligible, refund amount: ${refund_amount}")
+    logger.info("[Refund Workflow - Step 2] %s items eligible, refund amount: $%s", len(eligible_items), refund_amount)
 
     result = {
         "status": "success",
@@ -442,13 +443,13 @@ def process_refund(order_id: str, reason: str, tool_context: ToolContext) -> dic
         return validation_error_response(error_msg)
 
     user_id = tool_context.user_id
-    logger.info(f"[Refund Workflow - Step 3] Processing refund for order: {order_id}, reason: {reason}")
+    logger.info("[Refund Workflow - Step 3] Processing refund for order: %s, reason: %s", order_id, reason)
 
     # Validate refund reason FIRST (before any other processing)
     is_acceptable, reason_category, reason_explanation = _classify_refund_reason(reason)
 
     if not is_acceptable:
-        logger.warning(f"[Refund Workflow - Step 3] Reason not acceptable: {reason} -> {reason_category}")
+        logger.warning("[Refund Workflow - Step 3] Reason not acceptable: %s -> %s", reason, reason_category)
         audit_log(user_id, "process_refund", "order", order_id, False, f"Reason rejected: {reason_category}")
         return {
             "status": "reason_not_acceptable",
@@ -459,13 +460,13 @@ def process_refund(order_id: str, reason: str, tool_context: ToolContext) -> dic
             "suggestion": "If your product has an actual issue, please describe the problem (e.g., 'product is defective', 'arrived damaged').",
         }
 
-    logger.info(f"[Refund Workflow - Step 3] Reason accepted: {reason} -> {reason_category}")
+    logger.info("[Refund Workflow - Step 3] Reason accepted: %s -> %s", reason, reason_category)
 
     # Final ownership verification
     is_authorized, order_data, error_msg = verify_order_ownership(order_id, user_id, action="process_refund")
 
     if not is_authorized:
-        logger.error(f"[Refund Workflow - Step 3] BLOCKED - {error_msg}")
+        logger.error("[Refund Workflow - Step 3] BLOCKED - %s", error_msg)
         audit_log(user_id, "process_refund", "order", order_id, False, error_msg)
         return {"status": "error", "message": error_msg}
 
@@ -521,7 +522,7 @@ def process_refund(order_id: str, reason: str, tool_context: ToolContext) -> dic
 
     audit_log(user_id, "process_refund", "order", order_id, True, f"Refund {refund_id} created for ${refund_amount}")
 
-    logger.info(f"[Refund Workflow - Step 3] Refund {refund_id} created: ${refund_amount}")
+    logger.info("[Refund Workflow - Step 3] Refund %s created: $%s", refund_id, refund_amount)
 
     return {
         "status": "success",
@@ -573,19 +574,19 @@ def check_if_refundable(order_id: str, tool_context: ToolContext) -> dict:
         return validation_error_response(error_msg)
 
     user_id = tool_context.user_id
-    logger.info(f"[Refund Pre-Check] User {user_id} checking if order {order_id} is refundable")
+    logger.info("[Refund Pre-Check] User %s checking if order %s is refundable", user_id, order_id)
 
     # Check 1: Verify ownership
     is_authorized, order_data, error_msg = verify_order_ownership(order_id, user_id, action="check_if_refundable")
 
     if not is_authorized:
-        logger.warning(f"[Refund Pre-Check] Not authorized: {error_msg}")
+        logger.warning("[Refund Pre-Check] Not authorized: %s", error_msg)
         return {"status": "not_eligible", "eligible": False, "reason": error_msg}
 
     # Check 2: Order must be delivered
     order_status = order_data.get("status", "").lower()
     if order_status != "delivered":
-        logger.info(f"[Refund Pre-Check] Order {order_id} status is '{order_status}', not delivered")
+        logger.info("[Refund Pre-Check] Order %s status is '%s', not delivered", order_id, order_status)
 
         if order_status == "processing":
             return {
@@ -657,7 +658,7 @@ def check_if_refundable(order_id: str, tool_context: ToolContext) -> dict:
             refundable_items.append(item)
 
     if not refundable_items:
-        logger.info(f"[Refund Pre-Check] All items in order {order_id} already refunded")
+        logger.info("[Refund Pre-Check] All items in order %s already refunded", order_id)
         return {
             "status": "not_eligible",
             "eligible": False,
@@ -669,12 +670,19 @@ def check_if_refundable(order_id: str, tool_context: ToolContext) -> dict:
     refund_amount = _calculate_refund_amount(refundable_items)
     days_remaining = REFUND_WINDOW_DAYS - days_since_delivery
 
-    logger.info(f"[Refund Pre-Check] Order {order_id} is eligible. {len(refundable_items)} items, ${refund_amount}")
+    logger.info(
+        "[Refund Pre-Check] Order %s is eligible. %s items, $%s", order_id, len(refundable_items), refund_amount
+    )
 
     # Store in session state for later use
-    tool_context.state["refund_eligible_order_id"] = order_id
-    tool_context.state["refund_eligible_items"] = refundable_items
-    tool_context.state["refund_eligible_amount"] = refund_amount
+    update_state(
+        tool_context.state,
+        {
+            "refund_eligible_order_id": order_id,
+            "refund_eligible_items": refundable_items,
+            "refund_eligible_amount": refund_amount,
+        },
+    )
 
     result = {
         "status": "eligible",
@@ -718,7 +726,7 @@ def get_refundable_items(order_id: str, tool_context: ToolContext) -> dict:
         return validation_error_response(error_msg)
 
     user_id = tool_context.user_id
-    logger.info(f"[Refund Helper] User {user_id} checking refundable items for order: {order_id}")
+    logger.info("[Refund Helper] User %s checking refundable items for order: %s", user_id, order_id)
 
     # Verify ownership
     is_authorized, order_data, error_msg = verify_order_ownership(order_id, user_id, action="get_refundable_items")
@@ -22,6 +22,8 @@ from pathlib import Path
 
 import vertexai
 from dotenv import load_dotenv
+from google.adk.agents.context_cache_config import ContextCacheConfig
+from google.adk.apps import App
 from google.adk.plugins.logging_plugin import LoggingPlugin
 from vertexai import Client, agent_engines
 
@@ -33,7 +35,7 @@ sys.path.insert(0, str(project_root))
 # customer_support_agent, whose config.py validates GOOGLE_CLOUD_PROJECT at import time
 load_dotenv()
 
-from customer_support_agent.config import MODEL_ARMOR_CONFIG  # noqa: E402
+from customer_support_agent.config import CONTEXT_CACHE_CONFIG, MODEL_ARMOR_CONFIG, REDIS_URL  # noqa: E402
 from customer_support_agent.main import root_agent  # noqa: E402
 
 # =============================================================================
@@ -56,6 +58,7 @@ REQUIREMENTS = [
     "requests",
     "numpy>=1.24.0",
     "vertexai>=1.38.0",
+    "redis>=5.0.1",
 ]
 
 ENV_VARS = {
@@ -69,6 +72,10 @@ if MODEL_ARMOR_CONFIG["enabled"] and MODEL_ARMOR_CONFIG["template_id"]:
     ENV_VARS["MODEL_ARMOR_ENABLED"] = "true"
     ENV_VARS["MODEL_ARMOR_TEMPLATE_ID"] = MODEL_ARMOR_CONFIG["template_id"]
 
+# Shared tool-result cache (the runtime must be able to reach this Redis)
+if REDIS_URL:
+    ENV_VARS["REDIS_URL"] = REDIS_URL
+
 
 # =============================================================================
 # HELPERS
@@ -92,6 +99,24 @@ def build_plugins() -> list:
     return plugins
 
 
+def build_app() -> App:
+    """Build the ADK App: root agent, plugins and (if enabled) Gemini context caching."""
+    context_cache_config = None
+    if CONTEXT_CACHE_CONFIG["enabled"]:
+        context_cache_config = ContextCacheConfig(
+            ttl_seconds=CONTEXT_CACHE_CONFIG["ttl_seconds"],
+            cache_intervals=CONTEXT_CACHE_CONFIG["cache_intervals"],
+            min_tokens=CONTEXT_CACHE_CONFIG["min_tokens"],
+        )
+
+    return App(
+        name="customer_support",
+        root_agent=root_agent,
+        plugins=build_plugins(),
+        context_cache_config=context_cache_config,
+    )
+
+
 def get_numeric_project_id(project_id: str) -> str:
     """Get the numeric project ID (required for Memory Bank model paths).
 
@@ -176,12 +201,7 @@ async def test_locally():
     print("LOCAL TESTING")
     print("=" * 60)
 
-    app = agent_engines.AdkApp(
-        agent=root_agent,
-        app_name="customer_support",
-        enable_tracing=True,
-        plugins=build_plugins(),
-    )
+    app = agent_engines.AdkApp(app=build_app(), enable_tracing=True)
 
     session = await app.async_create_session(user_id="demo-user-001")
     print(f"\n✓ Created local session: {session.id}")
@@ -246,12 +266,7 @@ def deploy_to_agent_engine():
 
     client = Client(project=numeric_project_id, location=LOCATION)
 
-    adk_app = agent_engines.AdkApp(
-        agent=root_agent,
-        app_name="customer_support",
-        enable_tracing=True,
-        plugins=build_plugins(),
-    )
+    adk_app = agent_engines.AdkApp(app=build_app(), enable_tracing=True)
 
     # -------------------------------------------------------------------------
     # Stage 1: Update existing or create new
@@ -0,0 +1,87 @@
+"""
+Backfill is_active on Legacy Session Documents
+===============================================
+Run this ONCE before deploying a backend whose session list filters on
+is_active in Firestore.
+
+get_user_sessions queries is_active == True ordered by updated_at, and
+Firestore never returns documents that lack a queried field. Sessions written
+before is_active / updated_at were always set would silently disappear from
+the sidebar, so this script adds the missing fields (is_active = True,
+updated_at = created_at).
+
+Usage:
+    python scripts/backfill_session_is_active.py --project PROJECT_ID --database DATABASE_ID [--dry-run]
+"""
+
+import argparse
+
+from google.cloud import firestore
+
+# Firestore allows at most 500 writes per batch
+BATCH_SIZE = 500
+
+
+def backfill_sessions(project_id: str, database_id: str, dry_run: bool = False):
+    """Set is_active / updated_at on session documents that are missing them."""
+
+    print("=" * 60)
+    print("BACKFILLING SESSION is_active")
+    print("=" * 60)
+    print(f"Project: {project_id}")
+    print(f"Database: {database_id}")
+    if dry_run:
+        print("Mode: dry run (no writes)")
+
+    db = firestore.Client(project=project_id, database=database_id)
+
+    batch = db.batch()
+    pending = 0
+    scanned = 0
+    updated = 0
+
+    for doc in db.collection("sessions").select(["is_active", "updated_at", "created_at"]).stream():
+        scanned += 1
+        data = doc.to_dict()
+
+        fields = {}
+        if "is_active" not in data:
+            fields["is_active"] = True
+        if "updated_at" not in data:
+            fields["updated_at"] = data.get("created_at") or firestore.SERVER_TIMESTAMP
+        if not fields:
+            continue
+
+        updated += 1
+        print(f"   {doc.id}: setting {', '.join(sorted(fields))}")
+        if dry_run:
+            continue
+
+        batch.update(doc.reference, fields)
+        pending += 1
+        if pending == BATCH_SIZE:
+            batch.commit()
+            batch = db.batch()
+            pending = 0
+
+    if pending:
+        batch.commit()
+
+    print("\n" + "=" * 60)
+    print(f"✅ Scanned {scanned} sessions, {'would update' if dry_run else 'updated'} {updated}")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill is_active on legacy session documents")
+    parser.add_argument("--project", type=str, required=True, help="GCP Project ID")
+    parser.add_argument("--database", type=str, default="customer-support-db", help="Firestore database ID")
+    parser.add_argument("--dry-run", action="store_true", help="List the sessions that would be updated")
+
+    args = parser.parse_args()
+
+    backfill_sessions(project_id=args.project, database_id=args.database, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
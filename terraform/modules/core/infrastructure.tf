@@ -34,6 +34,42 @@ resource "google_firestore_database" "main" {
   depends_on = [google_project_service.apis]
 }
 
+# Backs Database.get_user_sessions: active sessions for a user, newest first
+resource "google_firestore_index" "sessions_by_user_active_updated" {
+  project    = var.project_id
+  database   = google_firestore_database.main.name
+  collection = "sessions"
+
+  fields {
+    field_path = "user_id"
+    order      = "ASCENDING"
+  }
+  fields {
+    field_path = "is_active"
+    order      = "ASCENDING"
+  }
+  fields {
+    field_path = "updated_at"
+    order      = "DESCENDING"
+  }
+}
+
+# Backs Database.get_user_sessions_version: newest session write for a user (ETag probe)
+resource "google_firestore_index" "sessions_by_user_updated" {
+  project    = var.project_id
+  database   = google_firestore_database.main.name
+  collection = "sessions"
+
+  fields {
+    field_path = "user_id"
+    order      = "ASCENDING"
+  }
+  fields {
+    field_path = "updated_at"
+    order      = "DESCENDING"
+  }
+}
+
 resource "google_artifact_registry_repository" "docker" {
   project       = var.project_id
   location      = var.region
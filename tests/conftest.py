@@ -75,6 +75,7 @@ def mock_db():
             patch("customer_support_agent.tools.order_tools.db_client", mock_client),
             patch("customer_support_agent.tools.billing_tools.db_client", mock_client),
             patch("customer_support_agent.tools.workflow_tools.db_client", mock_client),
+            patch("customer_support_agent.auth.db_client", mock_client),
         ):
             yield mock_client
 
@@ -159,6 +159,7 @@ def mock_backends():
         patch("customer_support_agent.tools.order_tools.db_client", mock_db),
         patch("customer_support_agent.tools.billing_tools.db_client", mock_db),
         patch("customer_support_agent.tools.workflow_tools.db_client", mock_db),
+        patch("customer_support_agent.auth.db_client", mock_db),
         patch("customer_support_agent.services.rag_search.RAGProductSearch", MockRAGProductSearch),
         patch("customer_support_agent.services.rag_search._rag_search", mock_rag),
         patch("customer_support_agent.services.rag_search.get_rag_search", return_value=mock_rag),
@@ -169,6 +170,11 @@ def mock_backends():
     for p in backend_patches:
         p.start()
 
+    # Cached tool results belong to the previous test's backend
+    from customer_support_agent.tools.tool_cache import clear_tool_caches
+
+    clear_tool_caches()
+
     yield
 
     for p in backend_patches + datetime_patches:
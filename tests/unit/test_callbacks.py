@@ -0,0 +1,306 @@
+"""
+Unit Tests for Agent Callbacks - CI/CD Compatible
+
+These tests run WITHOUT Vertex AI / LLM calls.
+They drive the callbacks directly with lightweight context stand-ins.
+
+Run with:
+    pytest tests/unit/test_callbacks.py -v -s
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from google.genai import types
+
+from customer_support_agent.agents import callbacks
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+
+def _memory_callback_context(session_id="session-1", agent_name="product_agent"):
+    """Callback context whose session has one user message and an async memory service."""
+    session = SimpleNamespace(
+        id=session_id,
+        user_id="user-1",
+        events=[SimpleNamespace(author="user", content="Do you sell laptops?")],
+    )
+    memory_service = MagicMock(spec=["add_session_to_memory"])
+    memory_service.add_session_to_memory = AsyncMock(return_value=None)
+    invocation_context = SimpleNamespace(memory_service=memory_service, session=session, app_name="customer_support")
+    return SimpleNamespace(_invocation_context=invocation_context, agent_name=agent_name)
+
+
+@pytest.fixture(autouse=True)
+def clear_recent_memory_saves():
+    """Each test starts without remembered saves, so nothing is skipped as unchanged."""
+    callbacks._recent_memory_saves.clear()
+    yield
+    callbacks._recent_memory_saves.clear()
+
+
+# =============================================================================
+# MEMORY BANK SAVES
+# =============================================================================
+
+
+class TestAutoSaveToMemory:
+    """Memory Bank saves are queued per event loop and flushed in the background."""
+
+    def test_save_is_flushed_when_short_lived_loop_exits(self):
+        """asyncio.run() ends before the flush interval; the queued save must still be sent."""
+        ctx = _memory_callback_context()
+
+        asyncio.run(callbacks.auto_save_to_memory(ctx))
+
+        memory_service = ctx._invocation_context.memory_service
+        memory_service.add_session_to_memory.assert_awaited_once_with(ctx._invocation_context.session)
+
+    def test_each_loop_flushes_its_own_saves(self):
+        """Consecutive asyncio.run() queries (AdkApp's sync path) each get their saves flushed."""
+        first = _memory_callback_context(session_id="session-1")
+        second = _memory_callback_context(session_id="session-2")
+
+        asyncio.run(callbacks.auto_save_to_memory(first))
+        asyncio.run(callbacks.auto_save_to_memory(second))
+
+        first._invocation_context.memory_service.add_session_to_memory.assert_awaited_once()
+        second._invocation_context.memory_service.add_session_to_memory.assert_awaited_once()
+
+    async def test_saves_within_a_turn_are_coalesced(self):
+        """Several agents finishing in one turn produce a single save of the session."""
+        ctx = _memory_callback_context()
+
+        for agent_name in ("product_agent", "order_agent", "root_agent"):
+            ctx.agent_name = agent_name
+            await callbacks.auto_save_to_memory(ctx)
+        await callbacks.flush_memory_saves()
+
+        ctx._invocation_context.memory_service.add_session_to_memory.assert_awaited_once()
+
+    async def test_unchanged_session_is_not_saved_twice(self):
+        ctx = _memory_callback_context()
+
+        await callbacks.auto_save_to_memory(ctx)
+        await callbacks.flush_memory_saves()
+        await callbacks.auto_save_to_memory(ctx)
+        await callbacks.flush_memory_saves()
+
+        ctx._invocation_context.memory_service.add_session_to_memory.assert_awaited_once()
+
+    async def test_session_without_user_messages_is_not_saved(self):
+        ctx = _memory_callback_context()
+        ctx._invocation_context.session.events = [SimpleNamespace(author="product_agent", content="Hello")]
+
+        await callbacks.auto_save_to_memory(ctx)
+        await callbacks.flush_memory_saves()
+
+        ctx._invocation_context.memory_service.add_session_to_memory.assert_not_awaited()
+
+
+# =============================================================================
+# OUT-OF-SCOPE GUARD
+# =============================================================================
+
+
+def _user_message_context(text):
+    """Callback context whose invocation was started by a user message with this text."""
+    return SimpleNamespace(user_content=types.Content(role="user", parts=[types.Part(text=text)]))
+
+
+class TestOutOfScopeGuard:
+    """Clearly off-topic requests are answered without a model call; shopping questions are not."""
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "Tell me a joke",
+            "Can you write me a short poem about the sea?",
+            "Could you tell us a riddle please",
+            "What's the weather like in Paris today?",
+            "How is the weather?",
+            "What's my horoscope?",
+            "what is 12 * 7?",
+        ],
+    )
+    def test_off_topic_request_is_answered_directly(self, text):
+        response = callbacks.out_of_scope_guard(_user_message_context(text))
+
+        assert response is not None
+        assert response.parts[0].text == callbacks.OUT_OF_SCOPE_RESPONSE
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "Is this jacket weather resistant?",
+            "Do you sell a recipe book?",
+            "Is the forecast for restock next week?",
+            "What is the weather rating of this tent?",
+            "Do you have any joke books for kids?",
+            "Tell me about the laptop warranty",
+            "Tell me a joke about my order ORD-12345",
+            "Where is my order ORD-12345?",
+            "",
+        ],
+    )
+    def test_shopping_question_reaches_the_model(self, text):
+        assert callbacks.out_of_scope_guard(_user_message_context(text)) is None
+
+
+# =============================================================================
+# REFUND WORKFLOW GATES
+# =============================================================================
+
+
+def _refund_context(agent_name, state):
+    """Tool / callback context for a refund workflow step, sharing one state dict."""
+    return SimpleNamespace(agent_name=agent_name, state=state)
+
+
+def _record(state, agent_name, tool_response):
+    callbacks.record_refund_step(None, {}, _refund_context(agent_name, state), tool_response)
+
+
+class TestRefundGates:
+    """Later refund steps are skipped without a model call unless every earlier step passed."""
+
+    def test_record_refund_step_stores_status_and_message(self):
+        state = {}
+
+        _record(state, "order_validator", {"status": "valid", "message": "Order ORD-67890 can be refunded"})
+        _record(state, "eligibility_checker", {"status": "error", "reason": "Outside the 30-day window"})
+
+        assert state["refund_validation"] == {"status": "valid", "message": "Order ORD-67890 can be refunded"}
+        assert state["refund_eligibility"] == {"status": "error", "message": "Outside the 30-day window"}
+
+    def test_record_refund_step_ignores_other_agents_and_non_dict_results(self):
+        state = {}
+
+        _record(state, "product_agent", {"status": "success"})
+        _record(state, "order_validator", "not a dict")
+
+        assert state == {}
+
+    def test_eligibility_runs_when_validation_passed(self):
+        state = {}
+        _record(state, "order_validator", {"status": "valid"})
+
+        assert callbacks.refund_gate(_refund_context("eligibility_checker", state)) is None
+
+    def test_eligibility_skipped_when_validation_failed(self):
+        state = {}
+        _record(state, "order_validator", {"status": "invalid", "message": "Order ORD-11111 was not delivered"})
+
+        response = callbacks.refund_gate(_refund_context("eligibility_checker", state))
+
+        assert response.parts[0].text == "Refund not processed. Order ORD-11111 was not delivered"
+
+    def test_eligibility_skipped_when_validation_status_missing(self):
+        state = {}
+        _record(state, "order_validator", {"message": "No status returned"})
+
+        response = callbacks.refund_gate(_refund_context("eligibility_checker", state))
+
+        assert response.parts[0].text == "Refund not processed. No status returned"
+
+    def test_eligibility_skipped_when_validation_never_ran(self):
+        response = callbacks.refund_gate(_refund_context("eligibility_checker", {}))
+
+        assert response.parts[0].text == "Refund not processed. order_validator did not complete"
+
+    def test_processor_runs_when_both_steps_passed(self):
+        state = {}
+        _record(state, "order_validator", {"status": "valid"})
+        _record(state, "eligibility_checker", {"status": "success"})
+
+        assert callbacks.refund_gate(_refund_context("refund_processor", state)) is None
+
+    def test_processor_skipped_when_eligibility_failed(self):
+        state = {}
+        _record(state, "order_validator", {"status": "valid"})
+        _record(state, "eligibility_checker", {"status": "error", "message": "Outside the 30-day window"})
+
+        response = callbacks.refund_gate(_refund_context("refund_processor", state))
+
+        assert response.parts[0].text == "Refund not processed. Outside the 30-day window"
+
+    def test_processor_skipped_when_eligibility_status_missing(self):
+        state = {}
+        _record(state, "order_validator", {"status": "valid"})
+        _record(state, "eligibility_checker", {})
+
+        response = callbacks.refund_gate(_refund_context("refund_processor", state))
+
+        assert response.parts[0].text == "Refund not processed. eligibility_checker did not complete"
+
+    def test_processor_skipped_when_validation_failed(self):
+        """The first failing prerequisite is reported, even if a later one passed."""
+        state = {}
+        _record(state, "order_validator", {"status": "invalid", "message": "Order not found"})
+        _record(state, "eligibility_checker", {"status": "success"})
+
+        response = callbacks.refund_gate(_refund_context("refund_processor", state))
+
+        assert response.parts[0].text == "Refund not processed. Order not found"
+
+    def test_ungated_agent_always_runs(self):
+        assert callbacks.refund_gate(_refund_context("order_validator", {})) is None
+
+    def test_reset_refund_gates_clears_previous_outcomes(self):
+        state = {}
+        _record(state, "order_validator", {"status": "valid"})
+        _record(state, "eligibility_checker", {"status": "success"})
+
+        callbacks.reset_refund_gates(_refund_context("order_validator", state))
+
+        assert state["refund_validation"] is None
+        assert state["refund_eligibility"] is None
+        assert callbacks.refund_gate(_refund_context("refund_processor", state)) is not None
+
+
+# =============================================================================
+# AGENT EXECUTION TRACKING
+# =============================================================================
+
+
+class TestAgentExecutionTracking:
+    """Start times, durations and the tracker TTL use the monotonic clock."""
+
+    @pytest.fixture(autouse=True)
+    def clear_tracker(self):
+        callbacks._agent_execution_tracker.clear()
+        yield
+        callbacks._agent_execution_tracker.clear()
+
+    @staticmethod
+    def _clock(monkeypatch, now):
+        """Drive callbacks' monotonic clock; the wall clock jumps backwards on every read."""
+        wall_clock = iter(range(10_000, 0, -100))
+        monkeypatch.setattr(callbacks.time, "monotonic", lambda: now[0])
+        monkeypatch.setattr(callbacks.time, "time", lambda: next(wall_clock))
+
+    async def test_hanging_agent_detected_after_30_seconds(self, monkeypatch):
+        now = [1000.0]
+        self._clock(monkeypatch, now)
+        ctx = _memory_callback_context(agent_name="order_agent")
+
+        await callbacks.track_agent_start(ctx)
+        now[0] += 31
+
+        hanging = await callbacks.check_hanging_agents()
+
+        assert [(h["agent"], h["elapsed_seconds"]) for h in hanging] == [("order_agent", 31.0)]
+
+    async def test_unfinished_agents_expire_after_ttl(self, monkeypatch):
+        now = [1000.0]
+        self._clock(monkeypatch, now)
+
+        await callbacks.track_agent_start(_memory_callback_context(session_id="session-1"))
+        now[0] += callbacks._TRACKER_TTL_SECONDS
+        await callbacks.track_agent_start(_memory_callback_context(session_id="session-2"))
+
+        assert list(callbacks._agent_execution_tracker) == ["product_agent:session-2"]
@@ -0,0 +1,88 @@
+"""
+Unit Tests for RAGProductSearch ranking - CI/CD Compatible
+
+These tests run WITHOUT Vertex AI / Firestore.
+The catalog is a small fixed set of 3-dimensional embeddings and the query
+embedding is injected, so similarities and ranking are exact.
+
+Run with:
+    pytest tests/unit/test_rag_search.py -v -s
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from customer_support_agent.services import rag_search
+
+# Imported before the autouse mock_backends fixture swaps the module attribute for the mock
+from customer_support_agent.services.rag_search import RAGProductSearch
+
+_CATALOG = {
+    "PROD-A": {"name": "Laptop A", "price": 900, "embedding": [1.0, 0.0, 0.0]},
+    "PROD-B": {"name": "Laptop B", "price": 400, "embedding": [0.9, 0.1, 0.0]},
+    "PROD-C": {"name": "Mouse C", "price": 30, "embedding": [0.0, 1.0, 0.0]},
+    "PROD-D": {"name": "Laptop D", "price": 500, "embedding": [-1.0, 0.0, 0.0]},
+    # Malformed entries that must be left out of the catalog
+    "PROD-WRONG-DIM": {"name": "Laptop Wrong", "price": 100, "embedding": [1.0, 0.0]},
+    "PROD-ZERO": {"name": "Laptop Zero", "price": 100, "embedding": [0.0, 0.0, 0.0]},
+    "PROD-NESTED": {"name": "Laptop Nested", "price": 100, "embedding": [[1.0], [0.0], [0.0]]},
+    "PROD-NO-EMBEDDING": {"name": "Laptop None", "price": 100},
+}
+
+
+@pytest.fixture
+def search(monkeypatch):
+    """RAGProductSearch over _CATALOG; every query embeds to [1, 0, 0]."""
+    monkeypatch.setattr(rag_search, "EMBEDDING_DIMENSION", 3)
+
+    docs = [
+        SimpleNamespace(id=product_id, to_dict=lambda data=data: {"category": "", "description": "", **data})
+        for product_id, data in _CATALOG.items()
+    ]
+    db = MagicMock()
+    db.collection.return_value.select.return_value.stream.side_effect = lambda: iter(docs)
+
+    with patch.object(rag_search.genai, "Client"):
+        search = RAGProductSearch("test-db", db=db)
+    search._embed_query = lambda query: [1.0, 0.0, 0.0]
+    return search
+
+
+class TestRAGRanking:
+    """Vectorized cosine similarity ranking and top-k selection."""
+
+    def test_malformed_embeddings_are_left_out_of_the_catalog(self, search):
+        products, product_matrix, product_norms = search._get_catalog()
+
+        assert [p["id"] for p in products] == ["PROD-A", "PROD-B", "PROD-C", "PROD-D"]
+        assert product_matrix.shape == (4, 3)
+        assert product_norms.shape == (4,)
+
+    def test_results_are_ranked_by_cosine_similarity(self, search):
+        results = search.search("anything", limit=4)
+
+        assert [r["id"] for r in results] == ["PROD-A", "PROD-B", "PROD-C", "PROD-D"]
+        assert [round(r["similarity"], 4) for r in results] == [1.0, 0.9939, 0.0, -1.0]
+
+    def test_top_k_returns_the_best_matches(self, search):
+        results = search.search("anything", limit=2)
+
+        assert [r["id"] for r in results] == ["PROD-A", "PROD-B"]
+
+    def test_price_filter_applies_after_ranking(self, search):
+        results = search.search("anything under $450", limit=4)
+
+        assert [r["id"] for r in results] == ["PROD-B", "PROD-C"]
+
+    def test_zero_query_embedding_returns_no_results(self, search):
+        search._embed_query = lambda query: [0.0, 0.0, 0.0]
+
+        assert search.search("anything") == []
+
+    def test_results_do_not_mutate_the_catalog(self, search):
+        search.search("anything")
+        products, _, _ = search._get_catalog()
+
+        assert all("similarity" not in p for p in products)
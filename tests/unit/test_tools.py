@@ -8,7 +8,7 @@ Run with:
     pytest tests/unit/test_tools.py -v -s
 """
 
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -137,6 +137,48 @@ class TestProductTools:
         # Reviews may or may not exist
         assert result["status"] in ["success", "error", "not_found"]
 
+    def test_check_inventory_is_cached(self):
+        """Repeated inventory lookups are served from the tool cache until cleared."""
+        from customer_support_agent.tools import product_tools
+        from customer_support_agent.tools.product_tools import check_inventory
+        from customer_support_agent.tools.tool_cache import clear_tool_caches
+
+        first = check_inventory(product_id="PROD-001")
+
+        inventory = product_tools.db_client._collections["inventory"]
+        inventory["PROD-001"] = {**inventory["PROD-001"], "total_stock": -1}
+        assert check_inventory("PROD-001") is first
+
+        clear_tool_caches()
+        assert check_inventory(product_id="PROD-001")["inventory"]["total_stock"] == -1
+
+    def test_validation_errors_are_not_cached(self):
+        """Invalid product IDs are rejected on every call, not cached."""
+        from customer_support_agent.tools import product_tools
+        from customer_support_agent.tools.product_tools import get_product_details
+
+        with patch.object(
+            product_tools, "validate_product_id", wraps=product_tools.validate_product_id
+        ) as validate_product_id:
+            assert get_product_details(product_id="bad id")["status"] == "validation_error"
+            assert get_product_details(product_id="bad id")["status"] == "validation_error"
+
+        # A cached result would have skipped the tool body on the second call
+        assert validate_product_id.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_get_all_saved_products_info(self, mock_tool_context):
+        """Test fetching all products from the last search (results keep search order)."""
+        from customer_support_agent.tools.product_tools import get_all_saved_products_info
+
+        mock_tool_context.state["products_to_detail"] = ["PROD-002", "PROD-999", "PROD-001"]
+        result = await get_all_saved_products_info(tool_context=mock_tool_context)
+
+        assert result["status"] == "success"
+        assert [p["product_id"] for p in result["products"]] == ["PROD-002", "PROD-999", "PROD-001"]
+        assert result["products"][1]["status"] == "not_found"
+        assert "inventory" in result["products"][0]
+
 
 # =============================================================================
 # ORDER TOOLS TESTS